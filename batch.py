@@ -0,0 +1,415 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from catalog import COLORS, CardCatalog
+from simulation import (DEFAULT_RULES, END_BUILDINGS, END_EMPTY_PILE, END_TURN_LIMIT,
+                        HEURISTIC_PERSONALITIES, AIPersonality, AIPlayer, AITester, Rules, _game_seeds)
+from stats import BattleStats
+
+
+class BatchTables:
+    """Tables des cartes indexées par id, construites depuis le catalogue"""
+
+    def __init__(self, catalog: CardCatalog):
+        n = len(catalog)
+        self.n_cards = n
+
+        # Tables de règles en float64 : les produits matriciels passent par BLAS,
+        # et les petites valeurs entières restent exactes
+        self.counts = np.array([card.how_many for card in catalog], dtype=np.int64)
+        self.price = np.array([card.price for card in catalog], dtype=np.float64)
+        self.specials = np.array([[card.special(color) for color in COLORS] for card in catalog],
+                                 dtype=np.float64)
+        self.special_sum = self.specials.sum(axis=1)
+
+        self.points = np.array([card.points for card in catalog], dtype=np.float64)
+        self.money = np.array([card.money for card in catalog], dtype=np.float64)
+        self.points_color = np.array([COLORS.index(card.points_color) if card.points_color else -1
+                                      for card in catalog], dtype=np.int64)
+        self.money_color = np.array([COLORS.index(card.money_color) if card.money_color else -1
+                                     for card in catalog], dtype=np.int64)
+
+        # Nombre de cartes dont les points / l'argent dépendent de chaque couleur
+        self.points_by_color = np.zeros((n, len(COLORS)), dtype=np.float64)
+        self.money_by_color = np.zeros((n, len(COLORS)), dtype=np.float64)
+        for card in catalog:
+            if card.points_color:
+                self.points_by_color[card.id, COLORS.index(card.points_color)] = 1
+            if card.money_color:
+                self.money_by_color[card.id, COLORS.index(card.money_color)] = 1
+
+        # reductions[i, j] : nombre d'occurrences de j dans les réductions de i
+        self.reductions = np.zeros((n, n), dtype=np.float64)
+        # prerequisites[i, j] : j fait partie des prérequis de i
+        self.prerequisites = np.zeros((n, n), dtype=np.float64)
+        self.has_prerequisites = np.zeros(n, dtype=bool)
+        # gates[i] : cartes d'une construction de prérequis à payer avant i (voir discard.DiscardOptimizer)
+        self.gates = np.zeros(n, dtype=np.float64)
+        for card in catalog:
+            for name in card.reductions:
+                other = catalog.get(name)
+                if other is not None:
+                    self.reductions[card.id, other.id] += 1
+            self.has_prerequisites[card.id] = bool(card.prerequisites)
+            prices = []
+            for name in card.prerequisites:
+                other = catalog.get(name)
+                if other is not None:
+                    self.prerequisites[card.id, other.id] = 1
+                    prices.append(other.price)
+            if card.prerequisites:
+                self.gates[card.id] = 1 + min(prices, default=card.price)
+
+        # Pour la valeur de garde : ce qu'une carte apporte aux autres (jamais à elle-même),
+        # restreint aux quelques cartes qui réduisent ou débloquent une autre carte
+        self.scaled = np.nonzero((self.points_by_color + self.money_by_color).sum(axis=1))[0]  # Points en couleur
+        others = self.reductions.copy()
+        np.fill_diagonal(others, 0)
+        self.reducers = np.nonzero(others.sum(axis=0))[0]
+        self.reduced_by_others = others[:, self.reducers]
+        self.gated = np.nonzero(self.has_prerequisites)[0]  # Cartes à prérequis
+        others = self.prerequisites[self.gated].copy()
+        others[np.arange(len(self.gated)), self.gated] = 0
+        self.unlockers = np.nonzero(others.sum(axis=0))[0]
+        self.unlocked_by_others = others[:, self.unlockers]
+
+        self.deck = np.repeat(np.arange(n), self.counts)
+
+
+class BatchResult:
+    """Résultats d'un lot de parties"""
+
+    def __init__(self, personalities: List[AIPersonality], scores: np.ndarray,
+                 turns: np.ndarray, end_reasons: np.ndarray, cities: np.ndarray):
+        self.personalities = personalities
+        self.scores = scores
+        self.turns = turns
+        self.end_reasons = end_reasons
+        self.cities = cities
+        self.winners = np.argmax(scores, axis=1)  # Premier joueur en cas d'égalité
+
+    def to_results(self) -> Dict[AIPersonality, Dict[str, int]]:
+        """Tableau victoires/points/parties au format de AITester"""
+        results = AITester.empty_results(self.personalities)
+        for seat, personality in enumerate(self.personalities):
+            results[personality]["wins"] += int((self.winners == seat).sum())
+            results[personality]["points"] += int(self.scores[:, seat].sum())
+            results[personality]["games"] += len(self.scores)
+        return results
+
+    def to_stats(self) -> BattleStats:
+        """Statistiques par siège, comme celles de AITester.run_ai_battle (même affichage)"""
+        stats = AITester.empty_stats(self.personalities)
+        for scores, winner in zip(self.scores.tolist(), self.winners.tolist()):
+            stats.record(scores, winner)
+        return stats
+
+
+class BatchEngine:
+    """Fait avancer N parties IA contre IA ensemble, tour par tour"""
+
+    def __init__(self, personalities: List[AIPersonality], nb_games: int,
+                 seed: Optional[int] = None, catalog: Optional[CardCatalog] = None,
+                 max_turns: Optional[int] = None, rules: Optional[Rules] = None):
+        if AIPersonality.MCTS in personalities:
+            raise ValueError("Le moteur par lots ne simule que les personnalités à poids fixes")
+        self.tables = BatchTables(catalog if catalog is not None else CardCatalog.default())
+        self.personalities = personalities
+        self.nb_games = nb_games
+        # Mêmes règles que Game (fin de partie, pioche, limite de main)
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.max_turns = max_turns if max_turns is not None else self.rules.battle_turns
+        self.rng = np.random.default_rng(seed)
+
+        nb_players = len(personalities)
+        n = self.tables.n_cards
+        self.weights = np.array([AIPlayer.WEIGHTS[p] for p in personalities], dtype=np.float64)
+
+        self.hands = np.zeros((nb_games, nb_players, n), dtype=np.int64)
+        self.cities = np.zeros((nb_games, nb_players, n), dtype=np.int64)
+        self.discard = np.zeros((nb_games, n), dtype=np.int64)
+
+        # Pioche : ids mélangés, on pioche par la fin
+        deck = np.broadcast_to(self.tables.deck, (nb_games, len(self.tables.deck)))
+        self.pile = self.rng.permuted(deck, axis=1)
+        self.pile_len = np.full(nb_games, len(self.tables.deck), dtype=np.int64)
+
+        self.turns = np.zeros(nb_games, dtype=np.int64)
+        self.end_reasons = np.zeros(nb_games, dtype=np.int64)
+
+    # --- Pioche -----------------------------------------------------------
+
+    def _reshuffle(self, game: int):
+        """Remet la défausse d'une partie dans sa pioche"""
+        cards = np.repeat(np.arange(self.tables.n_cards), self.discard[game])
+        self.rng.shuffle(cards)
+        self.pile[game, :len(cards)] = cards
+        self.pile_len[game] = len(cards)
+        self.discard[game] = 0
+
+    def _draw_one(self, games: np.ndarray, seat: int):
+        """Pioche une carte pour chaque partie donnée ; retourne (parties servies, ids)"""
+        for game in games[self.pile_len[games] == 0]:
+            self._reshuffle(game)
+        served = games[self.pile_len[games] > 0]
+        self.pile_len[served] -= 1
+        ids = self.pile[served, self.pile_len[served]]
+        self.hands[served, seat, ids] += 1
+        return served, ids
+
+    def _draw(self, games: np.ndarray, seat: int, amounts: np.ndarray):
+        """Pioche un nombre variable de cartes par partie"""
+        for k in range(int(amounts.max(initial=0))):
+            self._draw_one(games[amounts > k], seat)
+
+    # --- Évaluation -------------------------------------------------------
+
+    def _city_totals(self, seat: int):
+        """Spéciaux, points et argent de la ville du joueur, pour toutes les parties"""
+        t = self.tables
+        city = self.cities[:, seat].astype(np.float64)
+        specials = city @ t.specials
+        points = city @ t.points + ((city @ t.points_by_color) * specials).sum(axis=1)
+        money = city @ t.money + ((city @ t.money_by_color) * specials).sum(axis=1)
+        return specials, points.astype(np.int64), money.astype(np.int64)
+
+    def _card_values(self, seat: int, specials: np.ndarray) -> np.ndarray:
+        """Valeur de chaque carte pour l'IA de ce siège (même formule que AIPlayer.card_value)"""
+        t = self.tables
+        w_points, w_money, w_special, w_cost, _ = self.weights[seat]
+
+        def colored(flat, color):
+            extra = specials[:, np.maximum(color, 0)] + t.specials[np.arange(t.n_cards), np.maximum(color, 0)]
+            return np.where(color >= 0, extra, flat)
+
+        points = colored(t.points, t.points_color)
+        money = colored(t.money, t.money_color)
+        return w_points * points + w_money * money + w_special * t.special_sum - w_cost * t.price
+
+    def _build_costs(self, seat: int):
+        """Coût effectif et constructibilité de chaque carte, pour toutes les parties"""
+        t = self.tables
+        present = (self.cities[:, seat] > 0).astype(np.float64)
+        costs = np.maximum(t.price - present @ t.reductions.T, 0).astype(np.int64)
+
+        hand = self.hands[:, seat]
+        hand_size = hand.sum(axis=1)
+        prerequisites_ok = ~t.has_prerequisites | ((present @ t.prerequisites.T) > 0)
+        buildable = (hand > 0) & (costs + 1 <= hand_size[:, None]) & prerequisites_ok
+        return costs, buildable, hand_size
+
+    def _keep_context(self, games: np.ndarray, seat: int, values: Optional[np.ndarray] = None,
+                      costs: Optional[np.ndarray] = None):
+        """Parts de la valeur de garde qui ne dépendent que de la ville, pour ces parties (même modèle que
+        discard.HandValuation ; values, costs : lignes déjà calculées, sinon recalculées)"""
+        t = self.tables
+        w_points, w_money, _, w_cost, _ = self.weights[seat]
+        city = self.cities[games, seat].astype(np.float64)
+        if values is None:
+            values = self._card_values(seat, city @ t.specials)
+        if costs is None:
+            costs = np.maximum(t.price - (city > 0) @ t.reductions.T, 0)
+
+        # Valeur propre, bonus de couleur sur les cartes de la ville, réductions déjà acquises
+        scaled = t.scaled
+        per_color = city[:, scaled] @ (w_points * t.points_by_color[scaled] + w_money * t.money_by_color[scaled])
+        base = values + per_color @ t.specials.T
+        base += w_cost * (t.price - costs)
+        blocked = (city @ t.prerequisites[t.gated].T) == 0
+        # Seules les cartes pas encore construites profitent aux autres cartes de la main
+        return base, blocked, city[:, t.reducers] == 0, city[:, t.unlockers] == 0
+
+    def _losses(self, hand: np.ndarray, seat: int, context) -> np.ndarray:
+        """Perte d'un exemplaire de chaque carte de la main (lignes de hand, contexte de _keep_context)"""
+        t = self.tables
+        w_cost = self.weights[seat, 3]
+        base, blocked, reducers_absent, unlockers_absent = context
+        reducers, unlockers, gated = t.reducers, t.unlockers, t.gated
+        in_hand = (hand > 0).astype(np.float64)
+        losses = base.copy()
+
+        # Cartes bloquées : un prérequis à construire d'abord, voire à piocher
+        prerequisite_in_hand = (in_hand @ t.prerequisites[gated].T) > 0
+        losses[:, gated] -= w_cost * t.gates[gated] * blocked * np.where(prerequisite_in_hand, 1.0, 2.0)
+
+        # Dernier exemplaire d'une carte qui réduit le prix ou débloque d'autres cartes de la main
+        # (peu de cartes concernées : seulement leurs colonnes)
+        last = hand == 1
+        losses[:, reducers] += (w_cost * (in_hand @ t.reduced_by_others) * reducers_absent) * last[:, reducers]
+        losses[:, unlockers] += (w_cost * ((in_hand[:, gated] * blocked) @ t.unlocked_by_others)
+                                 * unlockers_absent) * last[:, unlockers]
+        return losses
+
+    def _discard_lowest(self, games: np.ndarray, seat: int, context, amounts: np.ndarray,
+                        keep: Optional[np.ndarray] = None):
+        """Défausse une à une les cartes de moindre perte marginale (comme discard.HandValuation.discards ;
+        keep : un exemplaire épargné par partie)"""
+        hand = self.hands[games, seat].copy()
+        available = hand.copy()
+        rows = np.arange(len(games))
+        if keep is not None:
+            available[rows, keep] -= 1
+
+        for step in range(int(amounts.max(initial=0))):
+            sub = rows[amounts > step]
+            losses = self._losses(hand[sub], seat, tuple(part[sub] for part in context))
+            losses[available[sub] <= 0] = np.inf
+            picks = np.argmin(losses, axis=1)  # À perte égale, la carte de plus petit id, comme la main objet
+            hand[sub, picks] -= 1
+            available[sub, picks] -= 1
+
+        self.discard[games] += self.hands[games, seat] - hand
+        self.hands[games, seat] = hand
+
+    # --- Tour de jeu ------------------------------------------------------
+
+    def _check_end(self, active: np.ndarray) -> np.ndarray:
+        """Met fin aux parties qui remplissent une condition de fin"""
+        buildings = (self.cities.sum(axis=2) >= self.rules.buildings_to_end).any(axis=1)
+        empty = self.pile_len == 0
+        limit = (self.turns >= self.rules.turn_limit) | (self.turns >= self.max_turns)
+
+        reason = np.where(buildings, END_BUILDINGS,
+                          np.where(empty, END_EMPTY_PILE,
+                                   np.where(limit, END_TURN_LIMIT, 0)))
+        ending = active & (reason > 0)
+        self.end_reasons[ending] = reason[ending]
+        return active & ~ending
+
+    def _play_seat(self, games: np.ndarray, seat: int):
+        """Joue le tour d'un siège dans toutes les parties actives"""
+        # Pioche basée sur l'argent
+        specials, _, money = self._city_totals(seat)
+        self._draw(games, seat, money[games])
+
+        values = self._card_values(seat, specials)
+        costs, buildable, hand_size = self._build_costs(seat)
+        w_cost, threshold = self.weights[seat, 3], self.weights[seat, 4]
+
+        scores = np.where(buildable, values - w_cost * costs, -np.inf)
+        targets = np.argmax(scores, axis=1)
+        best = scores[np.arange(self.nb_games), targets]
+        builds = buildable.any(axis=1) & ((best >= threshold) | (hand_size >= self.rules.max_cards - 2))
+
+        # Construire
+        builders = games[builds[games]]
+        if len(builders):
+            target = targets[builders]
+            context = self._keep_context(builders, seat, values[builders], costs[builders])
+            self._discard_lowest(builders, seat, context, costs[builders, target], keep=target)
+            self.hands[builders, seat, target] -= 1
+            self.cities[builders, seat, target] += 1
+
+            excess = self.hands[builders, seat].sum(axis=1) - self.rules.max_cards
+            over = excess > 0
+            if over.any():
+                # Valeurs avec la ville agrandie
+                self._discard_lowest(builders[over], seat, self._keep_context(builders[over], seat), excess[over])
+
+        # Piocher 5 cartes, garder la meilleure (règles par défaut)
+        drawers = games[~builds[games]]
+        if len(drawers):
+            nb_draw = self.rules.cards_to_draw
+            drawn = np.full((self.nb_games, nb_draw), -1, dtype=np.int64)
+            for k in range(nb_draw):
+                served, ids = self._draw_one(drawers, seat)
+                drawn[served, k] = ids
+
+            drawn = drawn[drawers]
+            # Dans le contexte de la main complétée (ville inchangée : valeurs et coûts encore valables)
+            context = self._keep_context(drawers, seat, values[drawers], costs[drawers])
+            nb_keep = max(nb_draw - self.rules.cards_to_discard, 1)
+            amounts = np.maximum((drawn >= 0).sum(axis=1) - nb_keep, 0)
+            hand = self.hands[drawers, seat].copy()
+            rows = np.arange(len(drawers))
+            for step in range(int(amounts.max(initial=0))):
+                sub = rows[amounts > step]
+                losses = self._losses(hand[sub], seat, tuple(part[sub] for part in context))
+                pending = drawn[sub]
+                slot_losses = np.where(pending >= 0, np.take_along_axis(losses, np.maximum(pending, 0), axis=1), np.inf)
+                slots = np.argmin(slot_losses, axis=1)  # À perte égale, la première piochée part
+                hand[sub, pending[np.arange(len(sub)), slots]] -= 1
+                drawn[sub, slots] = -1
+
+            self.discard[drawers] += self.hands[drawers, seat] - hand
+            self.hands[drawers, seat] = hand
+
+    def run(self) -> BatchResult:
+        """Joue toutes les parties jusqu'à leur fin"""
+        nb_players = len(self.personalities)
+        all_games = np.arange(self.nb_games)
+
+        for seat in range(nb_players):
+            self._draw(all_games, seat, np.full(self.nb_games, self.rules.initial_cards))
+
+        active = np.ones(self.nb_games, dtype=bool)
+        seat = 0
+        while True:
+            active = self._check_end(active)
+            games = np.nonzero(active)[0]
+            if not len(games):
+                break
+
+            self._play_seat(games, seat)
+
+            seat = (seat + 1) % nb_players
+            if seat == 0:
+                self.turns[games] += 1
+
+        scores = np.stack([self._city_totals(s)[1] for s in range(nb_players)], axis=1)
+        return BatchResult(self.personalities, scores, self.turns.copy(),
+                           self.end_reasons.copy(), self.cities.copy())
+
+
+def cross_check(personalities: List[AIPersonality], nb_games: int = 2000,
+                seed: int = 0, max_z: float = 4.0) -> dict:
+    """Compare les distributions de scores du moteur par lots et du moteur objet"""
+    batch = BatchEngine(personalities, nb_games, seed=seed).run()
+
+    object_scores = np.zeros((nb_games, len(personalities)), dtype=np.int64)
+    for game_num, game_seed in enumerate(_game_seeds(seed, nb_games)):
+        game = AITester.play_ai_game(personalities, game_seed)
+        object_scores[game_num] = [player.point for player in game.players]
+
+    report = {"games": nb_games, "seats": [], "ok": True}
+    for seat, personality in enumerate(personalities):
+        b, o = batch.scores[:, seat], object_scores[:, seat]
+        std_err = np.sqrt(b.var(ddof=1) / nb_games + o.var(ddof=1) / nb_games) or 1.0
+        z = abs(b.mean() - o.mean()) / std_err
+        report["seats"].append({
+            "personality": personality.value,
+            "batch_mean": float(b.mean()),
+            "object_mean": float(o.mean()),
+            "batch_std": float(b.std()),
+            "object_std": float(o.std()),
+            "batch_win_rate": float((batch.winners == seat).mean()),
+            "object_win_rate": float((np.argmax(object_scores, axis=1) == seat).mean()),
+            "z": float(z),
+        })
+        report["ok"] = report["ok"] and bool(z < max_z)
+    return report
+
+
+def main():
+    """Mesure le débit du moteur par lots et le compare au moteur objet"""
+    personalities = list(HEURISTIC_PERSONALITIES)
+
+    start = time.perf_counter()
+    result = BatchEngine(personalities, 10000, seed=0).run()
+    elapsed = time.perf_counter() - start
+    print(f"{len(result.scores)} parties en {elapsed:.2f}s "
+          f"({len(result.scores) / elapsed:.0f} parties/s)")
+    result.to_stats().display()
+
+    report = cross_check(personalities, nb_games=1000)
+    print("\nComparaison avec le moteur objet :")
+    for seat in report["seats"]:
+        print(f"{seat['personality']:14} | lots {seat['batch_mean']:5.2f} | "
+              f"objet {seat['object_mean']:5.2f} | z = {seat['z']:.2f}")
+    print("Distributions cohérentes" if report["ok"] else "⚠️  Distributions différentes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional, Tuple
+
+from catalog import CardCatalog
+from gameio import NULL_SINK
+from simulation import HEURISTIC_PERSONALITIES, AITester, Pioche, Player
+
+
+BASELINE_FILE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 25.0  # % de ralentissement toléré
+SEED = 1234
+SCORE_CALLS = 100  # Appels groupés par opération : quelques µs seules sont dominées par le bruit
+GAMES_PER_OP = 10  # Parties (graines fixes) jouées par opération de headless_game
+
+# Chaque benchmark prépare son état et retourne (opération, nombre d'unités par appel)
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable[[], None], int]]] = {}
+# Tolérance propre aux benchmarks plus bruités que la moyenne (% de ralentissement)
+THRESHOLDS: Dict[str, float] = {}
+
+
+def benchmark(name: str, threshold: Optional[float] = None):
+    """Enregistre une fonction de préparation de benchmark, avec sa tolérance éventuelle"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        if threshold is not None:
+            THRESHOLDS[name] = threshold
+        return setup
+    return register
+
+
+def _city_player(catalog: CardCatalog, size: int) -> Player:
+    """Joueur dont la ville contient les `size` premières cartes du catalogue"""
+    player = Player("bench", catalog)
+    player.events = NULL_SINK  # Comme en simulation : mesurer le calcul, pas l'écriture des messages
+    for card in list(catalog)[:size]:
+        player._add_to_city(card.name)
+    return player
+
+
+@benchmark("pioche_init", threshold=40.0)
+def _pioche_init():
+    catalog = CardCatalog.default()
+    return (lambda: Pioche(catalog, SEED)), 1
+
+
+@benchmark("pioche_draw", threshold=40.0)
+def _pioche_draw():
+    catalog = CardCatalog.default()
+    nb_cards = sum(card.how_many for card in catalog)
+
+    def op():
+        pioche = Pioche(catalog, SEED)
+        for _ in range(nb_cards):
+            pioche.defausser_id(pioche.pioche_id())
+    return op, nb_cards
+
+
+@benchmark("check_if_can_build")
+def _check_if_can_build():
+    catalog = CardCatalog.default()
+    player = _city_player(catalog, 10)
+    player.set_pioche(Pioche(catalog, SEED))
+    hand = [card.name for card in list(catalog)[10:22]]
+    for name in hand:
+        player.deck.append(name)
+
+    def op():
+        for name in hand:
+            player.check_if_can_build(name)
+    return op, len(hand)
+
+
+@benchmark("get_buildable_cards")
+def _get_buildable_cards():
+    catalog = CardCatalog.default()
+    player = _city_player(catalog, 10)
+    for card in list(catalog)[10:22]:
+        player.deck.append(card.name)
+
+    def op():
+        player._buildable_cache = None
+        player.get_buildable_cards()
+    return op, 1
+
+
+@benchmark("choose_discards", threshold=40.0)
+def _choose_discards():
+    catalog = CardCatalog.default()
+    player = _city_player(catalog, 10)
+    hand = [card.name for card in list(catalog)[10:22]]
+    for name in hand:
+        player.deck.append(name)
+
+    def op():
+        player._keep_cache = None
+        player.suggest_discards(hand, 4)
+    return op, 1
+
+
+def _score_benchmark(size: int):
+    def setup():
+        player = _city_player(CardCatalog.default(), size)
+
+        def op():
+            for _ in range(SCORE_CALLS):
+                player.calc_score()
+                player.calc_money()
+        return op, SCORE_CALLS
+    return setup
+
+
+for _size in (1, 5, 10, 20):
+    benchmark(f"calc_score_money_city_{_size}", threshold=40.0)(_score_benchmark(_size))
+
+
+@benchmark("headless_game")
+def _headless_game():
+    personalities = list(HEURISTIC_PERSONALITIES)
+    seeds = range(SEED, SEED + GAMES_PER_OP)
+
+    # Les mêmes parties à chaque appel : la charge mesurée ne dépend pas du nombre de répétitions
+    def op():
+        for seed in seeds:
+            AITester.play_ai_game(personalities, seed)
+    return op, len(seeds)
+
+
+@benchmark("run_ai_battle_games")
+def _run_ai_battle():
+    personalities = list(HEURISTIC_PERSONALITIES)
+    nb_games = 20
+    return (lambda: AITester.run_ai_battle(personalities, nb_games, seed=SEED)), nb_games
+
+
+def _calibration():
+    """Charge Python pure de référence (dictionnaire, tri) : suit les variations de vitesse de la machine"""
+    totals: Dict[int, int] = {}
+    for i in range(2000):
+        totals[i & 255] = totals.get(i & 255, 0) + i
+    sorted(totals.items(), key=lambda item: item[1])
+
+
+def _timed(op: Callable[[], None], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        op()
+    return time.perf_counter() - start
+
+
+def _calibrated_loops(op: Callable[[], None], min_time: float) -> int:
+    loops = 1
+    while _timed(op, loops) < min_time:
+        loops *= 2
+    return loops
+
+
+def measure(op: Callable[[], None], units: int, repeat: int = 9,
+            min_time: float = 0.2) -> Tuple[float, float]:
+    """Temps par unité en secondes et temps relatif à la charge de calibration : médianes de `repeat`
+    séries d'au moins `min_time`"""
+    loops = _calibrated_loops(op, min_time)
+    calibration_loops = _calibrated_loops(_calibration, min_time / 4)
+
+    # Chaque série est encadrée de deux calibrations : le rapport ne garde que ce qui dépend du code,
+    # pas la vitesse du moment (machine partagée, fréquence variable). La médiane résiste aux séries
+    # perturbées dans les deux sens, contrairement au meilleur temps
+    times, ratios = [], []
+    for _ in range(repeat):
+        before = _timed(_calibration, calibration_loops)
+        elapsed = _timed(op, loops)
+        after = _timed(_calibration, calibration_loops)
+        times.append(elapsed / (loops * units))
+        ratios.append(times[-1] / ((before + after) / (2 * calibration_loops)))
+    times.sort()
+    ratios.sort()
+    return times[len(times) // 2], ratios[len(ratios) // 2]
+
+
+def run_benchmarks(names=None, repeat: int = 9) -> Dict[str, Tuple[float, float]]:
+    """Lance les benchmarks demandés (tous par défaut), sans affichage du jeu : (secondes, relatif) par nom"""
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        for name, setup in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            with redirect_stdout(devnull):
+                op, units = setup()
+                results[name] = measure(op, units, repeat)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: Optional[float] = None) -> Dict[str, float]:
+    """Retourne les benchmarks ralentis au-delà de leur tolérance (`threshold` % si elle est imposée)"""
+    regressions = {}
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference:
+            change = (seconds / reference - 1.0) * 100
+            limit = threshold if threshold is not None else THRESHOLDS.get(name, DEFAULT_THRESHOLD)
+            if change > limit:
+                regressions[name] = change
+    return regressions
+
+
+def missing_baseline(results: Dict[str, float], baseline: Dict[str, float]) -> List[str]:
+    """Benchmarks sans référence : compare() ne peut rien en dire"""
+    return [name for name in results if not baseline.get(name)]
+
+
+def environment() -> Dict[str, str]:
+    """Machine et interpréteur qui produisent les mesures (une référence ne vaut que pour eux)"""
+    processor = platform.processor()
+    if not processor and os.path.exists("/proc/cpuinfo"):  # Vide sous Linux : le modèle est dans cpuinfo
+        with open("/proc/cpuinfo") as f:
+            processor = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), "")
+    return {
+        "machine": f"{platform.machine()} {processor}".strip(),
+        "cpus": str(os.cpu_count()),
+        "platform": platform.platform(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques de la simulation")
+    parser.add_argument("names", nargs="*", help="benchmarks à lancer (tous par défaut)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="fichier JSON de référence")
+    parser.add_argument("--save", action="store_true", help="enregistre les résultats comme référence")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"ralentissement toléré en %% avant échec (défaut : {DEFAULT_THRESHOLD:.0f}, "
+                             f"ou la tolérance propre au benchmark)")
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args(argv)
+
+    measured = run_benchmarks(args.names, args.repeat)
+    results = {name: seconds for name, (seconds, _) in measured.items()}
+    relative = {name: ratio for name, (_, ratio) in measured.items()}
+
+    # results : secondes par unité, pour l'affichage ; relative : rapport à la calibration, comparé
+    saved: Dict[str, float] = {}
+    baseline: Dict[str, float] = {}
+    recorded_on: Dict[str, str] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            data = json.load(f)
+        saved = data["results"]
+        baseline = data.get("relative", {})
+        recorded_on = data.get("environment", {})
+
+    for name, seconds in results.items():
+        line = f"{name:28} {seconds * 1e6:12.2f} µs/unité {1 / seconds:12.0f} /s"
+        if baseline.get(name):
+            line += f"   ({(relative[name] / baseline[name] - 1.0) * 100:+6.1f}%)"
+        print(line)
+
+    if args.save:
+        saved.update(results)
+        baseline.update(relative)
+        with open(args.baseline, "w") as f:
+            json.dump({"seed": SEED, "environment": environment(), "results": saved, "relative": baseline}, f,
+                      indent=2, sort_keys=True)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+
+    # Les tolérances couvrent le bruit d'une même machine, pas l'écart entre deux machines
+    if recorded_on != environment():
+        print(f"⚠️ Référence enregistrée sur un autre environnement ({recorded_on or 'inconnu'}) : "
+              f"la réenregistrer ici avec --save avant de s'y fier")
+    regressions = compare(relative, baseline, args.threshold)
+    for name, change in regressions.items():
+        print(f"❌ Régression : {name} est {change:.1f}% plus lent que la référence")
+    # Un benchmark absent de la référence n'est jamais vérifié : échec plutôt qu'un succès silencieux
+    missing = missing_baseline(relative, baseline)
+    for name in missing:
+        print(f"⚠️ {name} n'a pas de référence dans {args.baseline} (l'enregistrer avec --save {name})")
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
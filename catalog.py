@@ -0,0 +1,371 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from contextlib import contextmanager
+
+import profiling
+
+
+DB_NAME = 'city.db'
+COLORS = ("blue", "red", "green")
+
+# Catalogue précompilé : à incrémenter dès que le format de Card ou du fichier change
+ARTIFACT_VERSION = 1
+ARTIFACT_SUFFIX = ".catalog"
+
+
+@contextmanager
+def get_db_connection(db_name: str = DB_NAME):
+    """Context manager pour gérer les connexions à la base de données"""
+    conn = sqlite3.connect(db_name)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def artifact_path(db_name: str = DB_NAME) -> str:
+    """Chemin du catalogue précompilé associé à une base"""
+    return db_name + ARTIFACT_SUFFIX
+
+
+def db_fingerprint(db_name: str = DB_NAME) -> str:
+    """Empreinte du contenu de la base (fichier principal et journal WAL éventuel)"""
+    digest = hashlib.sha256()
+    for path in (db_name, db_name + "-wal"):
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _parse_value(raw) -> Tuple[int, Optional[str]]:
+    """Découpe une valeur money/points en (valeur fixe, couleur)"""
+    value = str(raw if raw is not None else "").strip()
+    if value.isdigit():
+        return int(value), None
+    if value in COLORS:
+        return 0, value
+    return 0, None
+
+
+def _parse_list(raw) -> Tuple[str, ...]:
+    """Découpe une colonne CSV (reduction_if, can_build_if) en noms nettoyés"""
+    if not raw:
+        return ()
+    return tuple(item.strip() for item in raw.split(",") if item.strip())
+
+
+class Card(NamedTuple):
+    """Fiche immuable d'une carte"""
+    id: int
+    name: str
+    how_many: int
+    price: int
+    special_blue: int
+    special_red: int
+    special_green: int
+    money: int
+    money_color: Optional[str]
+    points: int
+    points_color: Optional[str]
+    reductions: Tuple[str, ...]
+    prerequisites: Tuple[str, ...]
+    # Règles compilées sur les ids (bit i = carte d'id i), voir CardCatalog
+    reduction_masks: Tuple[int, ...] = ()
+    prerequisite_mask: int = 0
+
+    def special(self, color: str) -> int:
+        """Retourne la valeur spéciale de la carte pour une couleur"""
+        return getattr(self, f"special_{color}")
+
+
+class CardCatalog:
+    """Catalogue immuable de toutes les cartes, chargé une seule fois"""
+
+    __slots__ = ("_cards", "_by_name")
+
+    _default: Optional["CardCatalog"] = None
+
+    def __init__(self, cards):
+        cards = tuple(cards)
+        ids = {card.name: card.id for card in cards}
+        self._cards: Tuple[Card, ...] = tuple(self._compile_rules(card, ids) for card in cards)
+        self._by_name: Dict[str, Card] = {card.name: card for card in self._cards}
+
+    @staticmethod
+    def _compile_rules(card: Card, ids: Dict[str, int]) -> Card:
+        """Compile réductions et prérequis en masques de bits sur les ids"""
+        # Un nom répété compte plusieurs fois (ex. Hopital) : le masque k contient
+        # les cartes listées au moins k + 1 fois
+        reduction_masks: List[int] = []
+        for name in set(card.reductions):
+            if name not in ids:
+                continue
+            for k in range(card.reductions.count(name)):
+                if k == len(reduction_masks):
+                    reduction_masks.append(0)
+                reduction_masks[k] |= 1 << ids[name]
+
+        prerequisite_mask = 0
+        for name in card.prerequisites:
+            if name in ids:
+                prerequisite_mask |= 1 << ids[name]
+
+        return card._replace(reduction_masks=tuple(reduction_masks),
+                             prerequisite_mask=prerequisite_mask)
+
+    @classmethod
+    def from_db(cls, db_name: str = DB_NAME) -> "CardCatalog":
+        """Charge toute la table users en une seule requête"""
+        profiling.PROFILER.count("db_queries")
+        with get_db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT name, how_many, price, special_blue, special_red, special_green, "
+                "money, points, reduction_if, can_build_if FROM users ORDER BY id"
+            )
+            rows = cursor.fetchall()
+
+        cards = []
+        for (name, how_many, price, blue, red, green,
+             money, points, reduction_if, can_build_if) in rows:
+            name = (name or "").strip()
+            if not name:
+                continue  # Lignes vides de la table
+            money_value, money_color = _parse_value(money)
+            points_value, points_color = _parse_value(points)
+            cards.append(Card(
+                id=len(cards),
+                name=name,
+                how_many=int(how_many or 0),
+                price=int(price or 0),
+                special_blue=int(blue or 0),
+                special_red=int(red or 0),
+                special_green=int(green or 0),
+                money=money_value,
+                money_color=money_color,
+                points=points_value,
+                points_color=points_color,
+                reductions=_parse_list(reduction_if),
+                prerequisites=_parse_list(can_build_if),
+            ))
+        return cls(cards)
+
+    @classmethod
+    def _from_compiled(cls, cards: Tuple[Card, ...]) -> "CardCatalog":
+        """Catalogue à partir de fiches dont les règles sont déjà compilées"""
+        catalog = cls.__new__(cls)
+        catalog._cards = cards
+        catalog._by_name = {card.name: card for card in cards}
+        return catalog
+
+    def save_artifact(self, path: str, fingerprint: str):
+        """Écrit le catalogue précompilé (écriture atomique)"""
+        payload = (ARTIFACT_VERSION, fingerprint, tuple(tuple(card) for card in self._cards))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_artifact(cls, path: str, fingerprint: str) -> Optional["CardCatalog"]:
+        """Charge un catalogue précompilé, ou None s'il est absent, illisible ou périmé"""
+        try:
+            with open(path, "rb") as f:
+                version, artifact_fingerprint, cards = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+        if version != ARTIFACT_VERSION or artifact_fingerprint != fingerprint:
+            return None
+        return cls._from_compiled(tuple(Card(*card) for card in cards))
+
+    @classmethod
+    def compile(cls, db_name: str = DB_NAME, path: Optional[str] = None) -> "CardCatalog":
+        """Compile la base en catalogue précompilé et retourne le catalogue"""
+        fingerprint = db_fingerprint(db_name)
+        catalog = cls.from_db(db_name)
+        catalog.save_artifact(path or artifact_path(db_name), fingerprint)
+        return catalog
+
+    @classmethod
+    def load(cls, db_name: str = DB_NAME) -> "CardCatalog":
+        """Catalogue précompilé s'il correspond à la base, sinon recompilé depuis la base"""
+        fingerprint = db_fingerprint(db_name)
+        path = artifact_path(db_name)
+        catalog = cls.from_artifact(path, fingerprint)
+        if catalog is not None:
+            profiling.PROFILER.count("catalog_artifact_hits")
+            return catalog
+
+        catalog = cls.from_db(db_name)
+        # La base a pu changer pendant la lecture : l'empreinte doit être stable
+        if db_fingerprint(db_name) == fingerprint:
+            try:
+                catalog.save_artifact(path, fingerprint)
+            except OSError:
+                pass  # Répertoire en lecture seule : on se passe du fichier
+        return catalog
+
+    @classmethod
+    def default(cls) -> "CardCatalog":
+        """Catalogue partagé du processus, chargé au premier appel"""
+        if cls._default is None:
+            cls._default = cls.load()
+        return cls._default
+
+    def get(self, name: str) -> Optional[Card]:
+        """Retourne la fiche d'une carte par son nom, ou None"""
+        return self._by_name.get(name)
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Retourne l'id d'une carte par son nom, ou None"""
+        card = self._by_name.get(name)
+        return None if card is None else card.id
+
+    def __getitem__(self, card_id: int) -> Card:
+        return self._cards[card_id]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self._cards)
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def deck_list(self) -> List[str]:
+        """Liste de toutes les cartes du jeu, avec leurs exemplaires"""
+        deck: List[str] = []
+        for card in self._cards:
+            deck.extend([card.name] * card.how_many)
+        return deck
+
+
+class CardMultiset:
+    """Main ou ville : nombre d'exemplaires par id de carte"""
+
+    __slots__ = ("catalog", "_counts", "_size", "mask", "version")
+
+    def __init__(self, catalog: CardCatalog, names=()):
+        self.catalog = catalog
+        self._counts = bytearray(len(catalog))
+        self._size = 0
+        self.mask = 0  # Bit i levé si la carte d'id i est présente
+        self.version = 0  # Incrémenté à chaque modification (invalidation des caches)
+        for name in names:
+            self.append(name)
+
+    def _id(self, name: str) -> int:
+        card_id = self.catalog.id_of(name)
+        if card_id is None:
+            raise ValueError(f"Carte inconnue : {name}")
+        return card_id
+
+    # --- Accès par id -------------------------------------------------------
+
+    def add_id(self, card_id: int):
+        """Ajoute un exemplaire d'une carte"""
+        self._counts[card_id] += 1
+        self._size += 1
+        self.mask |= 1 << card_id
+        self.version += 1
+
+    def remove_id(self, card_id: int):
+        """Retire un exemplaire d'une carte"""
+        if not self._counts[card_id]:
+            raise ValueError(f"Carte absente : {self.catalog[card_id].name}")
+        self._counts[card_id] -= 1
+        self._size -= 1
+        if not self._counts[card_id]:
+            self.mask &= ~(1 << card_id)
+        self.version += 1
+
+    def count_id(self, card_id: int) -> int:
+        return self._counts[card_id]
+
+    def ids(self) -> Iterator[int]:
+        """Ids distincts présents"""
+        return (card_id for card_id, count in enumerate(self._counts) if count)
+
+    # --- Accès par nom (interface utilisateur) ------------------------------
+
+    def append(self, name: str):
+        self.add_id(self._id(name))
+
+    def remove(self, name: str):
+        self.remove_id(self._id(name))
+
+    def count(self, name: str) -> int:
+        card_id = self.catalog.id_of(name)
+        return 0 if card_id is None else self._counts[card_id]
+
+    def __contains__(self, name: str) -> bool:
+        card_id = self.catalog.id_of(name)
+        return card_id is not None and self._counts[card_id] > 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for card_id, count in enumerate(self._counts):
+            if count:
+                name = self.catalog[card_id].name
+                for _ in range(count):
+                    yield name
+
+    def __getitem__(self, index: int) -> str:
+        """Carte à la position donnée, dans l'ordre d'itération"""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("Indice hors de la main")
+        for card_id, count in enumerate(self._counts):
+            if index < count:
+                return self.catalog[card_id].name
+            index -= count
+        raise IndexError("Indice hors de la main")
+
+    def clear(self):
+        """Vide le multiensemble sur place"""
+        self._counts[:] = bytes(len(self._counts))
+        self._size = 0
+        self.mask = 0
+        self.version += 1
+
+    def snapshot(self) -> Tuple[bytes, int, int]:
+        """État compact : (compteurs par id, taille, masque)"""
+        return bytes(self._counts), self._size, self.mask
+
+    def restore(self, state: Tuple[bytes, int, int]):
+        """Remet le multiensemble dans un état produit par snapshot()"""
+        counts, size, mask = state
+        if len(counts) != len(self.catalog):
+            raise ValueError("État incompatible avec le catalogue")
+        self._counts[:] = counts
+        self._size = size
+        self.mask = mask
+        self.version += 1
+
+    def pop(self, index: int) -> str:
+        """Retire et retourne la carte à la position donnée"""
+        name = self[index]
+        self.remove(name)
+        return name
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+if __name__ == "__main__":
+    # Étape de build : python catalog.py [city.db]
+    db = sys.argv[1] if len(sys.argv) > 1 else DB_NAME
+    compiled = CardCatalog.compile(db)
+    print(f"{len(compiled)} cartes compilées dans {artifact_path(db)}")
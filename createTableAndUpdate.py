@@ -1,44 +1,171 @@
-import sqlite3 
+import csv
+import json
+import sqlite3
+import sys
+
+
+CARD_COLUMNS = ("name", "how_many", "price", "special_blue", "special_red", "special_green",
+                "money", "points", "reduction_if", "can_build_if")
+COLORS = ("blue", "red", "green")
+
+
+# Schéma normalisé : une ligne par carte (nom unique, donc indexé) et une ligne par
+# entrée de réduction / prérequis, rattachée à la carte par son id. La vue "users"
+# reconstruit l'ancienne table pour les requêtes existantes.
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS cards (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        how_many INTEGER NOT NULL DEFAULT 0,
+        price INTEGER NOT NULL,
+        special_blue INTEGER NOT NULL DEFAULT 0,
+        special_red INTEGER NOT NULL DEFAULT 0,
+        special_green INTEGER NOT NULL DEFAULT 0,
+        money TEXT NOT NULL DEFAULT '',
+        points TEXT NOT NULL DEFAULT ''
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS card_reductions (
+        card_id INTEGER NOT NULL REFERENCES cards(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        target_id INTEGER REFERENCES cards(id),
+        target_name TEXT NOT NULL,
+        PRIMARY KEY (card_id, position)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS card_prerequisites (
+        card_id INTEGER NOT NULL REFERENCES cards(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        target_id INTEGER REFERENCES cards(id),
+        target_name TEXT NOT NULL,
+        PRIMARY KEY (card_id, position)
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_card_reductions_target ON card_reductions(target_id)",
+    "CREATE INDEX IF NOT EXISTS idx_card_prerequisites_target ON card_prerequisites(target_id)",
+    # Les sous-requêtes triées fixent l'ordre de group_concat (positions d'origine)
+    '''
+    CREATE VIEW IF NOT EXISTS users AS
+    SELECT c.id, c.name, c.how_many, c.price,
+           c.special_blue, c.special_red, c.special_green, c.money, c.points,
+           COALESCE((SELECT group_concat(target_name, ',') FROM (
+               SELECT target_name FROM card_reductions r
+               WHERE r.card_id = c.id ORDER BY r.position)), '') AS reduction_if,
+           COALESCE((SELECT group_concat(target_name, ',') FROM (
+               SELECT target_name FROM card_prerequisites p
+               WHERE p.card_id = c.id ORDER BY p.position)), '') AS can_build_if
+    FROM cards c
+    ''',
+)
+
+# Colonne de l'ancienne table -> table de règles normalisée
+RULE_TABLES = {"reduction_if": "card_reductions", "can_build_if": "card_prerequisites"}
+CARD_TABLE_COLUMNS = CARD_COLUMNS[:8]
+
+
+def _create_schema(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
 
 
 def create_database(db_name):
     conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
-    
-    # Création de la table "users" corrigée
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            how_many INTEGER,
-            price INTEGER NOT NULL,
-            special_blue INTEGER DEFAULT 0,
-            special_red INTEGER DEFAULT 0,
-            special_green INTEGER DEFAULT 0,
-            money TEXT DEFAULT '',
-            points TEXT DEFAULT '',
-            reduction_if TEXT DEFAULT '',
-            can_build_if TEXT DEFAULT ''
-        )
-    ''')
-    
+    _create_schema(conn)
     conn.commit()
     conn.close()
 
 
+def _split_rule(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _rule_rows(card_id, value):
+    return [(card_id, position, name) for position, name in enumerate(_split_rule(value))]
+
+
+def _insert_rules(conn, column, rows):
+    # rows : (card_id, position, target_name) ; target_id est résolu par nom
+    conn.executemany(f'''
+        INSERT INTO {RULE_TABLES[column]} (card_id, position, target_id, target_name)
+        VALUES (?1, ?2, (SELECT id FROM cards WHERE name = ?3), ?3)
+    ''', rows)
+
+
+def _resolve_rule_targets(conn):
+    # Les noms qui ne correspondaient à aucune carte peuvent désigner une carte ajoutée depuis
+    for table in RULE_TABLES.values():
+        conn.execute(f'''
+            UPDATE {table} SET target_id = (SELECT id FROM cards WHERE name = target_name)
+            WHERE target_id IS NULL
+        ''')
+
+
+def migrate_schema(db_name):
+    # Migre une base à l'ancienne table "users" (règles en texte libre) vers le schéma
+    # normalisé, en une transaction. Retourne le nombre de cartes migrées. Sans effet
+    # sur une base déjà migrée : les fonctions d'écriture l'appellent avant d'écrire.
+    conn = sqlite3.connect(db_name, isolation_level=None)
+    try:
+        kind = conn.execute("SELECT type FROM sqlite_master WHERE name = 'users'").fetchone()
+        if kind is not None and kind[0] == 'view':
+            return 0
+
+        conn.execute("BEGIN")
+        rows = []
+        if kind is not None:
+            rows = conn.execute(f'''
+                SELECT id, {", ".join(CARD_COLUMNS)} FROM users ORDER BY id
+            ''').fetchall()
+            conn.execute("DROP TABLE users")
+        _create_schema(conn)
+
+        cards = []
+        rules = {column: [] for column in RULE_TABLES}
+        for card_id, name, how_many, price, blue, red, green, money, points, reduction_if, can_build_if in rows:
+            name = (name or "").strip()
+            if not name:
+                continue  # Lignes vides de l'ancienne table
+            cards.append((card_id, name, how_many or 0, price or 0, blue or 0, red or 0, green or 0,
+                          (money or "").strip(), (points or "").strip()))
+            rules["reduction_if"].extend(_rule_rows(card_id, reduction_if))
+            rules["can_build_if"].extend(_rule_rows(card_id, can_build_if))
+
+        conn.executemany(f'''
+            INSERT INTO cards (id, {", ".join(CARD_TABLE_COLUMNS)})
+            VALUES (?, {", ".join("?" * len(CARD_TABLE_COLUMNS))})
+        ''', cards)
+        for column, rule_rows in rules.items():
+            _insert_rules(conn, column, rule_rows)
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    print(f"{len(cards)} card(s) migrated")
+    return len(cards)
+
+
 def insert_user(db_name, name, how_many, price, special_blue=None, special_red=None, special_green=None):
+    migrate_schema(db_name)
     conn = sqlite3.connect(db_name)
     cursor = conn.cursor()
     
     # Insert a new user
     cursor.execute('''
-        INSERT INTO users (name, how_many, price, special_blue, special_red, special_green)
+        INSERT INTO cards (name, how_many, price, special_blue, special_red, special_green)
         VALUES (?, ?, ?, ?, ?, ?)
-    ''', (name, how_many, price, special_blue, special_red, special_green))
+    ''', (name.strip(), how_many or 0, price, special_blue or 0, special_red or 0, special_green or 0))
+    _resolve_rule_targets(conn)
     
     conn.commit()
     conn.close()
-    print(f"User {name} added with price {price} and special {special}")
+    print(f"User {name} added with price {price} and special {special_blue} {special_red} {special_green}")
 
 def add_line():
     while True:
@@ -63,35 +190,182 @@ def add_line():
                     special_red=special[1] if len(special) > 1 else None,
                     special_green=special[2] if len(special) > 2 else None)
         
-def add_reduc(db_name):
+def load_cards_file(path):
+    # Liste de cartes au format CSV (avec en-tête) ou JSON (liste d'objets)
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            return json.load(f)
+        return list(csv.DictReader(f))
+
+
+# Une colonne absente de la ligne vaut None : la valeur en base est conservée
+def _int_field(row, column, errors):
+    if column not in row:
+        return None
+    value = row[column]
+    if value is None or str(value).strip() == "":
+        return 0
     try:
-        with sqlite3.connect(db_name) as conn:
-            cursor = conn.cursor()
-
-            # Sélectionne tous les utilisateurs avec une réduction spéciale
-            cursor.execute("SELECT id, reduction_if FROM users WHERE special_blue > 0")
-            rows = cursor.fetchall()
-
-            for user_id, current_reduc in rows:
-                if current_reduc and current_reduc.strip():
-                    # On ajoute 'centre administratif' à la liste existante si elle n’y est pas déjà
-                    reduc_list = [r.strip() for r in current_reduc.split(',')]
-                    if 'centre administratif' not in reduc_list:
-                        reduc_list.append('centre administratif')
-                    new_reduc = ', '.join(reduc_list)
-                else:
-                    # Si aucun reduction_if, on met directement 'centre administratif'
-                    new_reduc = 'centre administratif'
-
-                # Mise à jour pour cet utilisateur
-                cursor.execute(
-                    "UPDATE users SET reduction_if = ? WHERE id = ?", (new_reduc, user_id)
-                )
-
-            conn.commit()
+        number = int(str(value).strip())
+    except ValueError:
+        errors.append(f"{column} doit être un entier (reçu {value!r})")
+        return 0
+    if number < 0:
+        errors.append(f"{column} doit être positif (reçu {number})")
+    return number
 
+
+def _value_field(row, column, errors):
+    # money / points : un entier ou une couleur
+    if column not in row:
+        return None
+    value = str(row[column] or "").strip()
+    if value and not value.isdigit() and value not in COLORS:
+        errors.append(f"{column} doit être un entier ou une couleur {COLORS} (reçu {value!r})")
+    return value
+
+
+def _list_field(row, column):
+    # reduction_if / can_build_if : noms séparés par des virgules, sans espaces parasites
+    if column not in row:
+        return None
+    return ",".join(item.strip() for item in str(row[column] or "").split(",") if item.strip())
+
+
+def validate_cards(rows):
+    # Normalise les lignes importées ; lève ValueError avec toutes les erreurs trouvées
+    cards = []
+    errors = []
+    seen = set()
+    for number, row in enumerate(rows, 1):
+        row_errors = []
+        name = str(row.get("name") or "").strip()
+        if not name:
+            row_errors.append("name est vide")
+        elif name in seen:
+            row_errors.append(f"la carte {name!r} apparaît plusieurs fois")
+        seen.add(name)
+
+        cards.append((
+            name,
+            _int_field(row, "how_many", row_errors),
+            _int_field(row, "price", row_errors),
+            _int_field(row, "special_blue", row_errors),
+            _int_field(row, "special_red", row_errors),
+            _int_field(row, "special_green", row_errors),
+            _value_field(row, "money", row_errors),
+            _value_field(row, "points", row_errors),
+            _list_field(row, "reduction_if"),
+            _list_field(row, "can_build_if"),
+        ))
+        errors.extend(f"ligne {number} : {error}" for error in row_errors)
+
+    if errors:
+        raise ValueError("Import refusé :\n" + "\n".join(errors))
+    return cards
+
+
+def import_cards(db_name, source):
+    # Import en masse (fichier CSV/JSON ou liste de dicts) en une seule transaction :
+    # les cartes existantes sont mises à jour (par nom), les nouvelles ajoutées
+    rows = load_cards_file(source) if isinstance(source, str) else source
+    cards = validate_cards(rows)
+
+    migrate_schema(db_name)
+    conn = sqlite3.connect(db_name)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            existing = dict(conn.execute("SELECT name, id FROM cards"))
+            missing_price = [card[0] for card in cards if card[0] not in existing and card[2] is None]
+            if missing_price:
+                raise ValueError(f"Import refusé : price est obligatoire pour {', '.join(missing_price)}")
+
+            fields = [card[:len(CARD_TABLE_COLUMNS)] for card in cards]
+            updates = [field + (existing[field[0]],) for field in fields if field[0] in existing]
+            inserts = [
+                tuple(("" if column in ("money", "points") else 0) if value is None else value
+                      for column, value in zip(CARD_TABLE_COLUMNS, field))
+                for field in fields if field[0] not in existing
+            ]
+
+            assignments = ", ".join(f"{column} = COALESCE(?, {column})" for column in CARD_TABLE_COLUMNS)
+            conn.executemany(f"UPDATE cards SET {assignments} WHERE id = ?", updates)
+            conn.executemany(f'''
+                INSERT INTO cards ({", ".join(CARD_TABLE_COLUMNS)})
+                VALUES ({", ".join("?" * len(CARD_TABLE_COLUMNS))})
+            ''', inserts)
+
+            # Règles : remplacées pour les colonnes présentes dans la source
+            ids = dict(conn.execute("SELECT name, id FROM cards"))
+            for offset, column in enumerate(RULE_TABLES, len(CARD_TABLE_COLUMNS)):
+                replaced = [(card[0], card[offset]) for card in cards if card[offset] is not None]
+                conn.executemany(f"DELETE FROM {RULE_TABLES[column]} WHERE card_id = ?",
+                                 [(ids[name],) for name, _ in replaced])
+                _insert_rules(conn, column, [row for name, value in replaced
+                                             for row in _rule_rows(ids[name], value)])
+            _resolve_rule_targets(conn)
+    finally:
+        conn.close()
+
+    print(f"{len(inserts)} card(s) added, {len(updates)} card(s) updated")
+    return len(inserts), len(updates)
+
+
+def add_rule(db_name, column, item, where="1", params=()):
+    # Ajoute `item` à la colonne (reduction_if ou can_build_if) de toutes les cartes
+    # vérifiant la condition SQL `where` (sur les colonnes de la vue users), en une
+    # seule requête. Idempotent : les cartes qui ont déjà la règle ne sont pas touchées.
+    # Retourne le nombre de cartes modifiées.
+    if column not in RULE_TABLES:
+        raise ValueError(f"Colonne de règle inconnue : {column}")
+    table = RULE_TABLES[column]
+    migrate_schema(db_name)
+    conn = sqlite3.connect(db_name)
+    try:
+        with conn:
+            cursor = conn.execute(f'''
+                INSERT INTO {table} (card_id, position, target_id, target_name)
+                SELECT u.id,
+                       COALESCE((SELECT MAX(position) + 1 FROM {table} WHERE card_id = u.id), 0),
+                       (SELECT id FROM cards WHERE name = ?1),
+                       ?1
+                FROM users u
+                WHERE ({where})
+                  AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.card_id = u.id AND t.target_name = ?1)
+            ''', (item, *params))
+            return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def remove_rule(db_name, column, item, where="1", params=()):
+    # Retire `item` de la colonne pour toutes les cartes vérifiant `where`
+    if column not in RULE_TABLES:
+        raise ValueError(f"Colonne de règle inconnue : {column}")
+    migrate_schema(db_name)
+    conn = sqlite3.connect(db_name)
+    try:
+        with conn:
+            cursor = conn.execute(f'''
+                DELETE FROM {RULE_TABLES[column]}
+                WHERE target_name = ?1 AND card_id IN (SELECT id FROM users WHERE ({where}))
+            ''', (item, *params))
+            return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def add_reduc(db_name):
+    # Toutes les cartes à spécial bleu profitent de la réduction 'centre administratif'
+    try:
+        changed = add_rule(db_name, "reduction_if", "centre administratif", "special_blue > 0")
+        print(f"{changed} card(s) updated")
+        return changed
     except sqlite3.Error as e:
         print(f"Une erreur est survenue : {e}")
 
 
-add_reduc('city.db')
+if __name__ == "__main__":
+    migrate_schema('city.db')
+    add_reduc('city.db')
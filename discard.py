@@ -0,0 +1,263 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from catalog import COLORS, Card, CardCatalog, CardMultiset
+
+
+Weights = Tuple[float, float, float, float, float]
+
+
+def intrinsic_value(card: Card, specials: Dict[str, int], weights: Weights) -> float:
+    """Valeur propre d'une carte : points, argent et spéciaux pondérés, moins son prix catalogue"""
+    w_points, w_money, w_special, w_cost, _ = weights
+
+    points = card.points
+    if card.points_color:
+        points = specials[card.points_color] + card.special(card.points_color)
+    money = card.money
+    if card.money_color:
+        money = specials[card.money_color] + card.special(card.money_color)
+    special_sum = card.special_blue + card.special_red + card.special_green
+
+    return w_points * points + w_money * money + w_special * special_sum - w_cost * card.price
+
+
+class DiscardOptimizer:
+    """Tables de liens entre cartes (réductions, prérequis) pour évaluer ce que vaut chaque carte d'une main"""
+
+    __slots__ = ("catalog", "_cards", "_ids", "_reduces", "_unlocks", "_gates", "_neighbours", "_specials_of",
+                 "_scaled_mask", "_prerequisite_mask", "_static")
+
+    _instances: Dict[int, "DiscardOptimizer"] = {}
+
+    def __init__(self, catalog: CardCatalog):
+        self.catalog = catalog
+        self._cards: Tuple[Card, ...] = tuple(catalog)  # Accès direct par id, sans passer par le catalogue
+        self._ids: Dict[str, int] = {card.name: card.id for card in catalog}
+        n = len(catalog)
+        reduces: List[List[int]] = [[] for _ in range(n)]
+        unlocks = [0] * n
+        gates = [0] * n
+        for card in catalog:
+            # reduces[i][k] : cartes qui listent i au moins k + 1 fois dans leurs réductions
+            for name in set(card.reductions):
+                other = catalog.get(name)
+                if other is None:
+                    continue
+                masks = reduces[other.id]
+                for k in range(card.reductions.count(name)):
+                    if k == len(masks):
+                        masks.append(0)
+                    masks[k] |= 1 << card.id
+
+            # unlocks[i] : cartes dont i est un prérequis ; gates : une construction à payer avant
+            prices = []
+            for name in card.prerequisites:
+                other = catalog.get(name)
+                if other is not None:
+                    unlocks[other.id] |= 1 << card.id
+                    prices.append(other.price)
+            if card.prerequisites:
+                gates[card.id] = 1 + min(prices, default=card.price)
+
+        self._reduces: Tuple[Tuple[int, ...], ...] = tuple(tuple(masks) for masks in reduces)
+        self._unlocks: Tuple[int, ...] = tuple(unlocks)
+        self._gates: Tuple[int, ...] = tuple(gates)
+        # _neighbours[i] : cartes dont la valeur change quand i quitte la main (celles qui la réduisent,
+        # ses prérequis, celles qu'elle débloque)
+        neighbours = []
+        for card in catalog:
+            mask = card.prerequisite_mask | unlocks[card.id]
+            for reducers in card.reduction_masks:
+                mask |= reducers
+            neighbours.append(mask & ~(1 << card.id))
+        self._neighbours: Tuple[int, ...] = tuple(neighbours)
+        self._specials_of = tuple(
+            tuple((color, card.special(color)) for color in COLORS if card.special(color))
+            for card in catalog
+        )
+        # Cartes dont les points ou l'argent dépendent d'une couleur, cartes à prérequis
+        self._scaled_mask = sum(1 << card.id for card in catalog if card.points_color or card.money_color)
+        self._prerequisite_mask = sum(1 << card.id for card in catalog if card.prerequisites)
+        self._static: Dict[Weights, Tuple[float, ...]] = {}
+
+    @classmethod
+    def for_catalog(cls, catalog: CardCatalog) -> "DiscardOptimizer":
+        """Instance partagée par catalogue (tables précalculées une seule fois)"""
+        optimizer = cls._instances.get(id(catalog))
+        if optimizer is None or optimizer.catalog is not catalog:
+            optimizer = cls._instances[id(catalog)] = cls(catalog)
+        return optimizer
+
+    def _static_values(self, weights: Weights) -> Tuple[float, ...]:
+        """Part de la valeur de garde indépendante de la ville et de la main, par carte"""
+        static = self._static.get(weights)
+        if static is None:
+            w_points, w_money, w_special, w_cost, _ = weights
+            static = self._static[weights] = tuple(
+                w_points * (card.special(card.points_color) if card.points_color else card.points)
+                + w_money * (card.special(card.money_color) if card.money_color else card.money)
+                + w_special * (card.special_blue + card.special_red + card.special_green)
+                - w_cost * card.price
+                for card in self._cards
+            )
+        return static
+
+    def valuation(self, deck: CardMultiset, city: CardMultiset, specials: Dict[str, int],
+                  points_by_color: Dict[str, int], money_by_color: Dict[str, int],
+                  weights: Weights) -> "HandValuation":
+        """Valeurs de garde de la main `deck` dans la ville `city`"""
+        city_mask = city.mask
+
+        # Cartes de la main bloquées par leurs prérequis
+        blocked = 0
+        candidates = deck.mask & self._prerequisite_mask
+        while candidates:
+            low = candidates & -candidates
+            candidates ^= low
+            if not city_mask & self._cards[low.bit_length() - 1].prerequisite_mask:
+                blocked |= low
+
+        # Valeur d'un point de bonus par couleur : cartes déjà construites qui en dépendent (compter aussi
+        # celles de la main surestime les bonus)
+        w_points, w_money = weights[0], weights[1]
+        synergy: Optional[Dict[str, float]] = {
+            color: w_points * points_by_color[color] + w_money * money_by_color[color] for color in COLORS
+        }
+        if not any(synergy.values()):
+            synergy = None
+        return HandValuation(self, deck, city_mask, specials, synergy, weights, blocked)
+
+
+class HandValuation:
+    """Valeur de garder chaque carte d'une main, et choix des cartes à donner ou défausser"""
+
+    __slots__ = ("optimizer", "deck", "city_mask", "specials", "synergy", "weights", "static", "blocked",
+                 "values", "_known")
+
+    def __init__(self, optimizer: DiscardOptimizer, deck: CardMultiset, city_mask: int,
+                 specials: Dict[str, int], synergy: Optional[Dict[str, float]], weights: Weights, blocked: int):
+        self.optimizer = optimizer
+        self.deck = deck
+        self.city_mask = city_mask
+        self.specials = specials
+        self.synergy = synergy
+        self.weights = weights
+        self.static = optimizer._static_values(weights)
+        self.blocked = blocked
+        # Par id de carte de la main : (valeur du dernier exemplaire, valeur d'un exemplaire en double),
+        # calculées à la demande (à la pioche, seules les cartes tirées comptent)
+        self.values: Dict[int, Tuple[float, float]] = {}
+        self._known = 0
+
+    def hand_values(self) -> Dict[int, Tuple[float, float]]:
+        """Valeurs de toutes les cartes distinctes de la main"""
+        self._require(self.deck.mask)
+        return self.values
+
+    def _require(self, mask: int):
+        missing = mask & ~self._known
+        if missing:
+            self.values.update(self._compute(self.deck.mask, missing))
+            self._known |= missing
+
+    def _compute(self, hand_mask: int, only_mask: int) -> Dict[int, Tuple[float, float]]:
+        """Valeurs des cartes de only_mask quand la main contient les cartes de hand_mask"""
+        optimizer, city_mask, blocked, synergy = self.optimizer, self.city_mask, self.blocked, self.synergy
+        cards, reduces, unlocks = optimizer._cards, optimizer._reduces, optimizer._unlocks
+        specials_of, scaled_mask = optimizer._specials_of, optimizer._scaled_mask
+        static, specials = self.static, self.specials
+        w_points, w_money, _, w_cost, _ = self.weights
+
+        values = {}
+        remaining = only_mask
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            card_id = bit.bit_length() - 1
+            card = cards[card_id]
+            value = static[card_id]
+
+            # Points et argent en couleur (comme intrinsic_value, le bonus de la carte est dans static)
+            if bit & scaled_mask:
+                if card.points_color:
+                    value += w_points * specials[card.points_color]
+                if card.money_color:
+                    value += w_money * specials[card.money_color]
+
+            # Bonus de couleur : multiplie les cartes de la ville qui en dépendent
+            if synergy is not None:
+                for color, special in specials_of[card_id]:
+                    value += special * synergy[color]
+
+            # Réductions déjà acquises par la ville : la carte coûtera moins de cartes
+            if card.reduction_masks and city_mask:
+                reduction = 0
+                for mask in card.reduction_masks:
+                    reduction += (city_mask & mask).bit_count()
+                value += w_cost * min(reduction, card.price)
+
+            # Carte bloquée : un prérequis à construire (et payer) d'abord, voire à piocher
+            if blocked & bit:
+                gate = w_cost * optimizer._gates[card_id]
+                value -= gate if hand_mask & card.prerequisite_mask else 2 * gate
+
+            # Carte qui réduit le prix ou débloque d'autres cartes de la main : un seul exemplaire suffit,
+            # un double n'apporte rien de plus
+            enables = 0
+            if not city_mask & bit:
+                others = hand_mask ^ bit
+                for mask in reduces[card_id]:
+                    enables += (others & mask).bit_count()
+                if blocked:
+                    enables += (blocked & others & unlocks[card_id]).bit_count()
+
+            values[card_id] = (value + w_cost * enables, value)
+        return values
+
+    def discards(self, cards: Sequence[str], nb_cards: int, keep: Optional[str] = None) -> List[int]:
+        """Positions de nb_cards cartes de `cards` (toutes en main) à perdre, dans l'ordre où elles sont choisies
+        (keep : un exemplaire épargné)"""
+        # Les pertes ne s'additionnent pas : une carte qui part retire leur bonus à celles qu'elle réduisait
+        # ou débloquait, et un double perdu ne coûte pas son dernier exemplaire. Glouton marginal : la carte
+        # la moins chère à perdre, puis les valeurs touchées par son départ sont recalculées. Heuristique :
+        # deux cartes liées qui partiraient mieux ensemble peuvent lui échapper
+        optimizer, deck = self.optimizer, self.deck
+        id_of = optimizer._ids
+        ids = [id_of[name] for name in cards]
+        positions = list(range(len(cards)))
+        if keep is not None:
+            positions.remove(cards.index(keep))
+        counts = {}
+        candidates = 0
+        for card_id in ids:
+            counts[card_id] = deck.count_id(card_id)
+            candidates |= 1 << card_id
+        self._require(candidates)
+        values = self.values
+        losses = [values[card_id][counts[card_id] > 1] for card_id in ids]
+        hand_mask = deck.mask
+
+        chosen = []
+        for _ in range(min(nb_cards, len(positions))):
+            # À perte égale, la première carte de la liste part d'abord
+            best = min(positions, key=losses.__getitem__)
+            positions.remove(best)
+            chosen.append(best)
+            card_id = ids[best]
+            counts[card_id] -= 1
+            if counts[card_id] == 1:
+                touched = 1 << card_id  # Le dernier exemplaire restant retrouve ses liens
+            elif counts[card_id]:
+                continue
+            else:
+                hand_mask ^= 1 << card_id
+                touched = hand_mask & optimizer._neighbours[card_id] & candidates
+                if not touched:
+                    continue
+                if values is self.values:
+                    values = dict(values)  # Les valeurs de la main complète restent en cache
+                values.update(self._compute(hand_mask, touched))
+            for i in positions:
+                if touched >> ids[i] & 1:
+                    losses[i] = values[ids[i]][counts[ids[i]] > 1]
+        return chosen
@@ -0,0 +1,153 @@
+from enum import IntEnum
+from typing import Any, Iterable, List, Protocol, Sequence, Tuple
+
+
+class Verbosity(IntEnum):
+    """Niveaux des messages du jeu : un puits n'écrit que ceux au-dessus de son seuil"""
+    DEBUG = 10    # Détails : état complet des joueurs, cartes utilisées
+    INFO = 20     # Déroulement de la partie
+    WARNING = 30  # Saisies refusées, actions impossibles
+    RESULT = 40   # Fin de partie et scores
+
+
+class EventSink:
+    """Reçoit les messages du jeu ; un message n'est formaté que s'il est écrit"""
+
+    def __init__(self, level: Verbosity = Verbosity.DEBUG):
+        self.level = level
+
+    def enabled(self, level: Verbosity) -> bool:
+        return level >= self.level
+
+    def emit(self, level: Verbosity, message: str, *args):
+        """Écrit `message.format(*args)` si le niveau est suffisant"""
+        if level >= self.level:
+            self.write(level, message.format(*args) if args else message)
+
+    def write(self, level: Verbosity, text: str):
+        raise NotImplementedError
+
+    def debug(self, message: str, *args):
+        self.emit(Verbosity.DEBUG, message, *args)
+
+    def info(self, message: str, *args):
+        self.emit(Verbosity.INFO, message, *args)
+
+    def warning(self, message: str, *args):
+        self.emit(Verbosity.WARNING, message, *args)
+
+    def result(self, message: str, *args):
+        self.emit(Verbosity.RESULT, message, *args)
+
+
+class ConsoleSink(EventSink):
+    """Affiche les messages dans le terminal"""
+
+    def write(self, level: Verbosity, text: str):
+        print(text)
+
+
+class ListSink(EventSink):
+    """Garde les messages en mémoire (tests, parties scriptées, serveur)"""
+
+    def __init__(self, level: Verbosity = Verbosity.DEBUG):
+        super().__init__(level)
+        self.lines: List[Tuple[Verbosity, str]] = []
+
+    def write(self, level: Verbosity, text: str):
+        self.lines.append((level, text))
+
+
+class NullSink(EventSink):
+    """Puits muet : aucun formatage, aucune sortie (simulations)"""
+
+    def __init__(self):
+        super().__init__(Verbosity.RESULT + 1)
+
+    def enabled(self, level: Verbosity) -> bool:
+        return False
+
+    def emit(self, level: Verbosity, message: str, *args):
+        pass
+
+    def debug(self, message: str, *args):
+        pass
+
+    def info(self, message: str, *args):
+        pass
+
+    def warning(self, message: str, *args):
+        pass
+
+    def result(self, message: str, *args):
+        pass
+
+
+CONSOLE = ConsoleSink()
+NULL_SINK = NullSink()
+
+
+class DecisionProvider(Protocol):
+    """Source des choix d'un siège : humain au clavier, IA ou réponses scriptées"""
+
+    def choose_action(self, player: Any, game_state: dict) -> str:
+        """'piocher', 'construire' ou 'info'"""
+
+    def choose_card(self, player: Any, buildable: Sequence[Tuple[str, int]]) -> str:
+        """Nom de la carte à construire"""
+
+    def choose_indices(self, player: Any, cards: Sequence[str], nb_cards: int, prompt: str) -> List[int]:
+        """Positions de `nb_cards` cartes dans `cards` (ValueError si la réponse est illisible)"""
+
+    def ask(self, prompt: str) -> str:
+        """Réponse libre (configuration de la partie, pauses)"""
+
+
+def _parse_indices(answer) -> List[int]:
+    if isinstance(answer, str):
+        answer = answer.split()
+    return [int(x) for x in answer]
+
+
+class ConsoleDecisions:
+    """Choix saisis au clavier"""
+
+    def choose_action(self, player: Any, game_state: dict) -> str:
+        return input("Que veux-tu faire ? (piocher/construire/info) : ").strip().lower()
+
+    def choose_card(self, player: Any, buildable: Sequence[Tuple[str, int]]) -> str:
+        return input("Quelle carte voulez-vous construire ? ").strip()
+
+    def choose_indices(self, player: Any, cards: Sequence[str], nb_cards: int, prompt: str) -> List[int]:
+        return _parse_indices(input(prompt))
+
+    def ask(self, prompt: str) -> str:
+        return input(prompt)
+
+
+class ScriptedDecisions:
+    """Réponses fournies à l'avance, consommées dans l'ordre (tests, rejeu, parties sans terminal)"""
+
+    def __init__(self, answers: Iterable):
+        self._answers = iter(answers)
+
+    def _next(self):
+        try:
+            return next(self._answers)
+        except StopIteration:
+            raise RuntimeError("Plus de réponses scriptées") from None
+
+    def choose_action(self, player: Any, game_state: dict) -> str:
+        return str(self._next()).strip().lower()
+
+    def choose_card(self, player: Any, buildable: Sequence[Tuple[str, int]]) -> str:
+        return str(self._next()).strip()
+
+    def choose_indices(self, player: Any, cards: Sequence[str], nb_cards: int, prompt: str) -> List[int]:
+        return _parse_indices(self._next())
+
+    def ask(self, prompt: str) -> str:
+        return str(self._next())
+
+
+CONSOLE_DECISIONS = ConsoleDecisions()
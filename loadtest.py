@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from server import DEFAULT_PORT
+
+
+class BotClient:
+    """Joueur distant automatique : construit dès qu'il peut, sinon pioche, et suit les conseils de défausse"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.latencies: List[float] = []  # Secondes entre une réponse et la question suivante
+        self.completed = 0
+        self.failed = 0  # Tables refusées, fermées ou en erreur
+
+    async def send(self, message: dict):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    @staticmethod
+    def answer(message: dict):
+        kind = message["kind"]
+        if kind == "action":
+            return "construire" if message["buildable"] else "piocher"
+        if kind == "card":
+            return message["buildable"][0][0]
+        return message.get("suggested") or list(range(message["count"]))  # payment / discard
+
+    async def play_game(self, ais: List[str], level: str, seed: Optional[int]) -> bool:
+        """Crée une table (le bot et des IA) et la joue jusqu'au bout ; False si elle a été refusée ou fermée"""
+        await self.send({"op": "create", "ais": ais, "humans": 1, "name": "bot", "level": level, "seed": seed})
+        seated = False
+        sent = None
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("Serveur déconnecté")
+            message = json.loads(line)
+            op = message["op"]
+            if op == "ask":
+                if sent is not None:
+                    self.latencies.append(time.perf_counter() - sent)
+                await self.send({"op": "answer", "id": message["id"], "value": self.answer(message)})
+                sent = time.perf_counter()
+            elif op == "joined":
+                seated = True
+            elif op == "over":
+                return True
+            elif op == "closed":
+                return False
+            elif op == "error" and not seated:  # Assis, une erreur est une réponse refusée : elle est redemandée
+                return False
+
+
+async def _run_level(host: str, port: int, tables: int, games: int, ais: List[str], level: str):
+    """`tables` clients jouent chacun `games` parties en parallèle"""
+    async def client(index: int) -> BotClient:
+        reader, writer = await asyncio.open_connection(host, port)
+        bot = BotClient(reader, writer)
+        try:
+            for game in range(games):
+                if await bot.play_game(ais, level, seed=index * games + game):
+                    bot.completed += 1
+                else:
+                    bot.failed += 1
+        finally:
+            writer.close()
+        return bot
+
+    start = time.perf_counter()
+    bots = await asyncio.gather(*(client(i) for i in range(tables)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for bot in bots for latency in bot.latencies)
+    return elapsed, latencies, sum(bot.completed for bot in bots), sum(bot.failed for bot in bots)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+async def _wait_for_server(host: str, port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def _main(args) -> int:
+    await _wait_for_server(args.host, args.port)
+    print(f"{'tables':>7} {'parties/s':>10} {'échecs':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    sustained = 0
+    for tables in args.tables:
+        elapsed, latencies, completed, failed = await _run_level(args.host, args.port, tables, args.games,
+                                                                 args.ais, args.level)
+        p95 = _percentile(latencies, 0.95) * 1000
+        # Débit des seules parties menées à terme
+        print(f"{tables:7d} {completed / elapsed:10.1f} {failed:7d} "
+              f"{_percentile(latencies, 0.50) * 1000:8.2f} {p95:8.2f} {_percentile(latencies, 0.99) * 1000:8.2f}",
+              flush=True)
+        if p95 <= args.target_ms and not failed:
+            sustained = tables
+    print(f"Tables tenues avec un p95 ≤ {args.target_ms:g} ms : {sustained}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Charge le serveur de jeu avec des tables jouées par des bots")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--tables", type=int, nargs="+", default=[1, 4, 16, 64, 256],
+                        help="nombres de tables simultanées à essayer")
+    parser.add_argument("--games", type=int, default=3, help="parties par table")
+    parser.add_argument("--ais", nargs="+", default=["aggressive", "economic", "balanced"])
+    parser.add_argument("--level", default="result", help="messages envoyés aux clients (debug … result)")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="latence p95 acceptable")
+    parser.add_argument("--spawn", action="store_true", help="lance le serveur dans un sous-processus")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"),
+                                   "--host", args.host, "--port", str(args.port)])
+    try:
+        return asyncio.run(_main(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
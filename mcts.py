@@ -0,0 +1,232 @@
+import atexit
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import profiling
+from catalog import CardCatalog
+from gameio import NULL_SINK
+from simulation import AIPersonality, AIPlayer, AITester, Game, GameSnapshot, Rules
+
+
+# Coup candidat : None pour piocher, sinon (carte à construire, cartes données en paiement)
+Action = Optional[Tuple[str, Tuple[str, ...]]]
+
+# Pools de processus réutilisés d'un coup à l'autre, par nombre de workers
+_POOLS: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    if workers not in _POOLS:
+        _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _POOLS[workers]
+
+
+@atexit.register
+def shutdown_pools():
+    """Arrête les processus des pools (aussi appelé à la sortie de l'interpréteur)"""
+    while _POOLS:
+        _, pool = _POOLS.popitem()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _simulation_game(snapshot: GameSnapshot, catalog: Optional[CardCatalog],
+                     rules: Optional[Rules] = None) -> Game:
+    """Partie de simulation : tous les sièges (MCTS et humains compris) jouent la politique par défaut"""
+    game = Game(catalog, events=NULL_SINK, rules=rules)
+    for name, personality, difficulty, weights in snapshot.roster:
+        if personality is None or personality == AIPersonality.MCTS.value:
+            personality, weights = AIPersonality.BALANCED.value, None
+        game.add_ai_player(name, AIPersonality(personality), difficulty, weights)
+    return game
+
+
+def _redeal_hidden_hands(game: Game, seat: int):
+    """Remet les mains adverses, inconnues du siège, dans la pioche et en redistribue autant au hasard"""
+    pioche = game.pioche
+    opponents = [player for index, player in enumerate(game.players) if index != seat]
+    sizes = [len(player.deck) for player in opponents]
+    hidden = []
+    for player in opponents:
+        for card_id in player.deck.ids():
+            hidden.extend([card_id] * player.deck.count_id(card_id))
+        player.deck.clear()
+    # Le siège ne distingue pas la pioche des mains adverses : tout est remélangé ensemble
+    pioche.remettre_et_melanger(hidden)
+    for player, size in zip(opponents, sizes):
+        for _ in range(size):
+            player.deck.add_id(pioche.pioche_id())
+
+
+def _select(stats: List[List[float]], total: int, exploration: float) -> int:
+    """UCB1 : chaque coup est essayé une fois, puis compromis gain moyen / exploration"""
+    for index, (visits, _) in enumerate(stats):
+        if not visits:
+            return index
+    log_total = math.log(total)
+    return max(range(len(stats)),
+               key=lambda i: stats[i][1] / stats[i][0] + exploration * math.sqrt(log_total / stats[i][0]))
+
+
+def _playout(game: Game, seat: int, action: Action, max_turns: int) -> float:
+    """Joue le coup puis la fin de partie ; 1 si le siège gagne (partagé en cas d'égalité)"""
+    player = game.players[seat]
+    if action is None:
+        player.ai_handle_pioche_action()
+    else:
+        carte, payment = action
+        player.build(carte, list(payment))
+        player.ai_check_carte()
+
+    while True:
+        game.next_turn()
+        if game.current_player_index == 0:
+            game.turn_counter += 1
+        if game.turn_counter >= max_turns or game._check_end_conditions():
+            break
+        AITester.play_ai_turn(game, game.current_player())
+
+    for p in game.players:
+        p.calc_score()
+    best = max(p.point for p in game.players)
+    if player.point < best:
+        return 0.0
+    return 1.0 / sum(1 for p in game.players if p.point == best)
+
+
+def run_playouts(snapshot: GameSnapshot, seat: int, actions: List[Action],
+                 playouts: Optional[int], time_budget: Optional[float], seed: int,
+                 exploration: float = 1.4, max_turns: int = 50,
+                 catalog: Optional[CardCatalog] = None,
+                 rules: Optional[Rules] = None) -> List[List[float]]:
+    """Parties aléatoires depuis le snapshot ; retourne [visites, gains] par coup"""
+    rng = random.Random(seed)
+    game = _simulation_game(snapshot, catalog, rules)
+    pioche = game.pioche
+    stats = [[0, 0.0] for _ in actions]
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    for n in itertools.count():
+        if playouts is not None and n >= playouts:
+            break
+        if deadline is not None and n and time.perf_counter() >= deadline:
+            break
+        index = _select(stats, n, exploration)
+        game.restore(snapshot)
+        # L'ordre de la pioche et les mains adverses sont inconnus du joueur : tirés au hasard à chaque partie
+        pioche.rng.seed(rng.getrandbits(32))
+        _redeal_hidden_hands(game, seat)
+        stats[index][0] += 1
+        stats[index][1] += _playout(game, seat, actions[index], max_turns)
+    return stats
+
+
+class MCTSPlayer(AIPlayer):
+    """IA qui choisit chaque coup par parties aléatoires simulées (Monte Carlo, UCB1 à la racine)"""
+
+    def __init__(self, name: str, game: Game, difficulty: float = 1.0,
+                 catalog: Optional[CardCatalog] = None, playouts: Optional[int] = 64,
+                 time_budget: Optional[float] = None, workers: int = 1,
+                 exploration: float = 1.4, max_turns: Optional[int] = None):
+        if playouts is None and time_budget is None:
+            raise ValueError("Il faut un budget : nombre de parties simulées et/ou temps par coup")
+        super().__init__(name, AIPersonality.MCTS, difficulty, catalog)
+        self.game: Game = game
+        self.playouts: Optional[int] = playouts
+        self.time_budget: Optional[float] = time_budget  # secondes par coup
+        self.workers: int = workers
+        self.exploration: float = exploration
+        self.max_turns: Optional[int] = max_turns  # None : limite des parties entre IAs des règles de la partie
+        self.last_search: Dict[str, float] = {}
+        self._plan: Action = None
+
+    def reset(self):
+        super().reset()
+        self.last_search = {}
+        self._plan = None
+
+    def candidate_actions(self) -> List[Action]:
+        """Piocher, ou construire chaque carte possible avec quelques paiements différents"""
+        actions: List[Action] = [None]
+        for carte, cost in self.get_buildable_cards():
+            payments = {tuple(self._choose_discards(cost, keep=carte))}
+            # Variante : se séparer des cartes les plus chères, les plus longues à construire
+            others = list(self.deck)
+            others.remove(carte)
+            others.sort(key=lambda name: -self.catalog.get(name).price)
+            payments.add(tuple(others[:cost]))
+            actions.extend((carte, payment) for payment in sorted(payments))
+        return actions
+
+    def search(self) -> Action:
+        """Évalue les coups candidats par simulation et retourne le plus visité"""
+        actions = self.candidate_actions()
+        self.last_search = {}
+        if len(actions) == 1:
+            return actions[0]
+
+        snapshot = self.game.snapshot()
+        seat = self.game.players.index(self)
+        seed = self.rng.getrandbits(32)
+        max_turns = self.max_turns if self.max_turns is not None else self.game.rules.battle_turns
+        start = time.perf_counter()
+        with profiling.PROFILER.phase("mcts_search"):
+            if self.workers > 1:
+                stats = self._parallel_playouts(snapshot, seat, actions, seed, max_turns)
+            else:
+                stats = run_playouts(snapshot, seat, actions, self.playouts, self.time_budget,
+                                     seed, self.exploration, max_turns, self.catalog,
+                                     self.game.rules)
+        elapsed = time.perf_counter() - start
+
+        total = sum(visits for visits, _ in stats)
+        self.last_search = {
+            "playouts": total,
+            "seconds": elapsed,
+            "playouts_per_s": total / elapsed if elapsed else 0.0,
+        }
+        profiling.PROFILER.count("mcts_playouts", total)
+        best = max(range(len(actions)), key=lambda i: (stats[i][0], stats[i][1]))
+        return actions[best]
+
+    def _parallel_playouts(self, snapshot: GameSnapshot, seat: int, actions: List[Action],
+                           seed: int, max_turns: int) -> List[List[float]]:
+        """Parallélisation à la racine : chaque processus cherche seul, les statistiques s'additionnent"""
+        share = None if self.playouts is None else -(-self.playouts // self.workers)
+        seeds = random.Random(seed)
+        futures = [
+            _pool(self.workers).submit(run_playouts, snapshot, seat, actions, share, self.time_budget,
+                                       seeds.getrandbits(32), self.exploration, max_turns,
+                                       self.catalog, self.game.rules)
+            for _ in range(self.workers)
+        ]
+        stats = [[0, 0.0] for _ in actions]
+        for future in futures:
+            for total, (visits, wins) in zip(stats, future.result()):
+                total[0] += visits
+                total[1] += wins
+        return stats
+
+    def make_decision(self, game_state: dict) -> str:
+        """Choisit entre piocher et construire par simulation"""
+        self._plan = self.search()
+        if self.last_search:
+            self.events.debug("{} a simulé {} parties ({:.0f}/s)", self.name,
+                              self.last_search["playouts"], self.last_search["playouts_per_s"])
+        return "piocher" if self._plan is None else "construire"
+
+    def choose_card_to_build(self, game_state: dict) -> Optional[str]:
+        """Carte retenue par la dernière recherche"""
+        if self._plan is None:
+            return super().choose_card_to_build(game_state)
+        return self._plan[0]
+
+    def ai_build(self, carte: str) -> bool:
+        """Construit avec le paiement retenu par la recherche"""
+        plan, self._plan = self._plan, None
+        if plan is None or plan[0] != carte:
+            return super().ai_build(carte)
+        return self.build(carte, list(plan[1]))
@@ -0,0 +1,223 @@
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from catalog import CardCatalog
+
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY,
+        seed INTEGER,
+        nb_players INTEGER NOT NULL,
+        turns INTEGER NOT NULL,
+        end_reason INTEGER NOT NULL,
+        winner INTEGER NOT NULL
+    )
+    ''',
+    # Une ligne par siège ; city = nombre d'exemplaires construits par id de carte (1 octet par carte)
+    '''
+    CREATE TABLE IF NOT EXISTS seats (
+        game_id INTEGER NOT NULL REFERENCES games(id),
+        seat INTEGER NOT NULL,
+        personality TEXT,
+        score INTEGER NOT NULL,
+        won INTEGER NOT NULL,
+        city BLOB NOT NULL,
+        PRIMARY KEY (game_id, seat)
+    ) WITHOUT ROWID
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_seats_personality ON seats(personality)",
+    # Noms des ids de carte utilisés dans les colonnes city
+    "CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY, name TEXT NOT NULL)",
+)
+
+
+class GameOutcome(NamedTuple):
+    """Résultat d'une partie terminée, tel qu'il est stocké"""
+    seed: Optional[int]
+    turns: int
+    end_reason: int
+    winner: int
+    personalities: Tuple[Optional[str], ...]  # None pour un humain
+    scores: Tuple[int, ...]
+    cities: Tuple[bytes, ...]
+
+    @classmethod
+    def from_game(cls, game, seed: Optional[int] = None, max_turns: Optional[int] = None) -> "GameOutcome":
+        """Résultat d'une partie terminée (scores déjà calculés)"""
+        players = game.players
+        scores = tuple(player.point for player in players)
+        # Même départage que AITester.record_game : le premier des meilleurs scores
+        winner = scores.index(max(scores)) if scores else -1
+        return cls(
+            seed=seed,
+            turns=game.turn_counter,
+            end_reason=game.end_reason(max_turns),
+            winner=winner,
+            personalities=tuple(
+                player.personality.value if getattr(player, "personality", None) else None
+                for player in players
+            ),
+            scores=scores,
+            cities=tuple(player.city.snapshot()[0] for player in players),
+        )
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    return conn
+
+
+class OutcomeStore:
+    """Journal des parties en ajout seul (SQLite WAL), écrit par lots"""
+
+    def __init__(self, path: str, catalog: Optional[CardCatalog] = None):
+        self.path = path
+        self.catalog = catalog if catalog is not None else CardCatalog.default()
+        self.conn = _connect(path)
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            known = dict(self.conn.execute("SELECT id, name FROM cards"))
+            if known and known != {card.id: card.name for card in self.catalog}:
+                raise ValueError(f"{path} a été écrit avec un autre catalogue de cartes")
+            self.conn.executemany("INSERT OR IGNORE INTO cards (id, name) VALUES (?, ?)",
+                                  [(card.id, card.name) for card in self.catalog])
+
+    def write(self, outcomes: Iterable[GameOutcome]) -> int:
+        """Ajoute un lot de parties en une transaction ; retourne le nombre de parties"""
+        outcomes = list(outcomes)
+        with self.conn:
+            # Verrou d'écriture pris avant de lire MAX(id) : un autre processus qui ajoute au même
+            # journal attend son tour au lieu de calculer les mêmes ids
+            self.conn.execute("BEGIN IMMEDIATE")
+            first = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM games").fetchone()[0]
+            self.conn.executemany(
+                "INSERT INTO games (id, seed, nb_players, turns, end_reason, winner) VALUES (?, ?, ?, ?, ?, ?)",
+                [(first + i, o.seed, len(o.scores), o.turns, o.end_reason, o.winner)
+                 for i, o in enumerate(outcomes)],
+            )
+            self.conn.executemany(
+                "INSERT INTO seats (game_id, seat, personality, score, won, city) VALUES (?, ?, ?, ?, ?, ?)",
+                [(first + i, seat, personality, score, int(seat == o.winner), city)
+                 for i, o in enumerate(outcomes)
+                 for seat, (personality, score, city) in enumerate(zip(o.personalities, o.scores, o.cities))],
+            )
+        return len(outcomes)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class OutcomeWriter:
+    """Écrit les parties depuis un thread de fond : record() ne fait que mettre en file"""
+
+    _STOP = object()
+
+    def __init__(self, path: str, catalog: Optional[CardCatalog] = None,
+                 batch_size: int = 1000, flush_interval: float = 1.0):
+        self.store = OutcomeStore(path, catalog)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.error: Optional[BaseException] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="outcome-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, outcome: GameOutcome):
+        """Met une partie en file d'écriture"""
+        if self.error is not None:
+            raise RuntimeError("L'écriture du journal des parties a échoué") from self.error
+        self._queue.put(outcome)
+
+    def record_game(self, game, seed: Optional[int] = None, max_turns: Optional[int] = None):
+        self.record(GameOutcome.from_game(game, seed, max_turns))
+
+    def _run(self):
+        batch: List[GameOutcome] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            # Un lot part quand il est plein, à intervalle régulier, ou à la fermeture
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    self.written += self.store.write(batch)
+                except BaseException as e:
+                    self.error = e
+                    return
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    def close(self):
+        """Écrit les parties en attente et ferme le journal"""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self.store.close()
+        if self.error is not None:
+            raise RuntimeError("L'écriture du journal des parties a échoué") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def load_seats(path: str, personality: Optional[str] = None):
+    """Colonnes des sièges en tableaux numpy : (noms des cartes, villes, scores, victoires)"""
+    import numpy as np  # Seules les requêtes d'analyse ont besoin de numpy
+
+    conn = sqlite3.connect(path)
+    try:
+        names = [name for _, name in conn.execute("SELECT id, name FROM cards ORDER BY id")]
+        query = "SELECT city, score, won FROM seats"
+        params: tuple = ()
+        if personality is not None:
+            query += " WHERE personality = ?"
+            params = (personality,)
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    cities = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.uint8).reshape(len(rows), len(names))
+    scores = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+    won = np.fromiter((row[2] for row in rows), dtype=bool, count=len(rows))
+    return names, cities, scores, won
+
+
+def win_rate_by_card(path: str, personality: Optional[str] = None,
+                     min_seats: int = 1) -> List[Tuple[str, int, float]]:
+    """Taux de victoire des sièges ayant construit chaque carte : (carte, sièges, taux), du meilleur au pire"""
+    names, cities, _, won = load_seats(path, personality)
+    built = cities > 0
+    seats = built.sum(axis=0)
+    wins = (built & won[:, None]).sum(axis=0)
+    rows = [(names[i], int(seats[i]), float(wins[i] / seats[i]))
+            for i in range(len(names)) if seats[i] >= min_seats]
+    rows.sort(key=lambda row: -row[2])
+    return rows
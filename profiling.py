@@ -0,0 +1,146 @@
+import atexit
+import json
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional
+
+
+class _NullPhase:
+    """Contexte vide, partagé, utilisé quand le profilage est désactivé"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class NullProfiler:
+    """Profileur désactivé : chaque appel ne fait rien"""
+
+    enabled = False
+
+    def phase(self, name: str) -> _NullPhase:
+        return _NULL_PHASE
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+
+class _Phase:
+    """Chronomètre une phase et l'empile pour les piles du flame graph"""
+
+    __slots__ = ("profiler", "name", "start", "children")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.children = 0.0
+        self.profiler._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        stack = profiler._stack
+        path = ";".join(phase.name for phase in stack)
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+
+        stats = profiler.phases.setdefault(self.name, [0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        profiler.stacks[path] = profiler.stacks.get(path, 0.0) + elapsed - self.children
+        return False
+
+
+class Profiler:
+    """Temps et nombre d'appels par phase, compteurs d'événements"""
+
+    enabled = True
+
+    def __init__(self):
+        self.phases: Dict[str, List] = {}    # nom -> [appels, secondes]
+        self.stacks: Dict[str, float] = {}   # pile "a;b;c" -> temps propre en secondes
+        self.counters: Dict[str, int] = {}
+        self._stack: List[_Phase] = []
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        """Rapport sérialisable en JSON"""
+        return {
+            "phases": {
+                name: {"calls": calls, "total_s": total, "mean_us": total / calls * 1e6}
+                for name, (calls, total) in sorted(self.phases.items(), key=lambda x: -x[1][1])
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "stacks": self.stacks,
+        }
+
+    def merge(self, report: dict, prefix: str = ""):
+        """Ajoute le rapport d'un autre profileur (ex. d'un processus du pool)"""
+        for name, stats in report["phases"].items():
+            mine = self.phases.setdefault(name, [0, 0.0])
+            mine[0] += stats["calls"]
+            mine[1] += stats["total_s"]
+        for path, seconds in report["stacks"].items():
+            path = f"{prefix};{path}" if prefix else path
+            self.stacks[path] = self.stacks.get(path, 0.0) + seconds
+        for name, value in report["counters"].items():
+            self.count(name, value)
+
+    def dump(self, path: str):
+        """Écrit le rapport : JSON, ou piles repliées pour flamegraph.pl / speedscope (.folded)"""
+        with open(path, "w") as f:
+            if path.endswith(".folded"):
+                for stack, seconds in sorted(self.stacks.items()):
+                    f.write(f"{stack} {int(seconds * 1e6)}\n")
+            else:
+                json.dump(self.report(), f, indent=2)
+
+
+# Profileur courant du processus ; les modules instrumentés l'appellent via profiling.PROFILER
+PROFILER = NullProfiler()
+
+
+def enable() -> Profiler:
+    """Active le profilage pour le processus et retourne le profileur"""
+    global PROFILER
+    if not PROFILER.enabled:
+        PROFILER = Profiler()
+    return PROFILER
+
+
+def reset() -> Profiler:
+    """Installe un profileur neuf (ex. dans un processus du pool, hérité par fork)"""
+    global PROFILER
+    PROFILER = Profiler()
+    return PROFILER
+
+
+def disable() -> Optional[Profiler]:
+    """Désactive le profilage et retourne le profileur qui était actif"""
+    global PROFILER
+    previous = PROFILER if PROFILER.enabled else None
+    PROFILER = NullProfiler()
+    return previous
+
+
+# CITY_PROFILE=rapport.json (ou .folded) active le profilage et écrit le rapport en fin de run
+if os.environ.get("CITY_PROFILE") and multiprocessing.parent_process() is None:
+    atexit.register(enable().dump, os.environ["CITY_PROFILE"])
@@ -0,0 +1,183 @@
+import hashlib
+import pickle
+import sys
+from array import array
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from catalog import CardCatalog
+from gameio import NULL_SINK
+from simulation import AIPersonality, AITester, Game, GameSnapshot, Player, _game_seeds
+
+
+# Flux de décisions : entiers 16 bits, chaque opération commence par son code et le siège
+OP_DRAW = 1      # siège, nombre de cartes demandées
+OP_DISCARD = 2   # siège, n, ids des n cartes défaussées
+OP_BUILD = 3     # siège, id de la carte construite, n, ids des n cartes de paiement
+OP_NEXT = 4      # siège (ignoré) : joueur suivant
+
+REPLAY_VERSION = 1
+
+
+class ReplayError(Exception):
+    """Le replay ne reproduit pas la partie enregistrée"""
+
+
+class ReplayLog(NamedTuple):
+    """Partie enregistrée : graine, sièges, décisions et empreinte de l'état final"""
+    version: int
+    seed: int
+    roster: Tuple[tuple, ...]  # Comme GameSnapshot.roster (sans les poids avant leur ajout)
+    ops: bytes
+    digest: str
+
+
+def state_digest(snapshot: GameSnapshot) -> str:
+    """Empreinte de l'état d'une partie, sans ce qui dépend du type des joueurs (IA ou non)"""
+    # Le générateur propre à chaque joueur ne sert qu'aux décisions des IA, absentes du replay
+    players = tuple(state[:-1] for state in snapshot.players)
+    state = snapshot._replace(players=players, roster=())
+    return hashlib.sha256(pickle.dumps(state, protocol=4)).hexdigest()
+
+
+class ReplayRecorder:
+    """Enregistre les actions d'une partie (Game.set_recorder) dans un flux compact"""
+
+    def __init__(self):
+        self.game: Optional[Game] = None
+        self.ops = array('h')
+
+    def attach(self, game: Game):
+        """Commence l'enregistrement, une fois les joueurs ajoutés"""
+        if game.seed is None:
+            raise ValueError("Seule une partie créée avec une graine peut être rejouée")
+        self.game = game
+        game.set_recorder(self)
+
+    def _seat(self, player: Player) -> int:
+        return self.game.players.index(player)
+
+    def draw(self, player: Player, nb_cards: int):
+        self.ops.extend((OP_DRAW, self._seat(player), nb_cards))
+
+    def discard(self, player: Player, cards: List[str]):
+        id_of = self.game.catalog.id_of
+        self.ops.extend((OP_DISCARD, self._seat(player), len(cards)))
+        self.ops.extend(id_of(card) for card in cards)
+
+    def build(self, player: Player, card: str, payment: List[str]):
+        id_of = self.game.catalog.id_of
+        self.ops.extend((OP_BUILD, self._seat(player), id_of(card), len(payment)))
+        self.ops.extend(id_of(name) for name in payment)
+
+    def next_turn(self):
+        self.ops.extend((OP_NEXT, 0))
+
+    def finish(self) -> ReplayLog:
+        """Arrête l'enregistrement ; à appeler une fois les scores finaux calculés"""
+        game = self.game
+        game.set_recorder(None)
+        snapshot = game.snapshot()
+        return ReplayLog(REPLAY_VERSION, game.seed, snapshot.roster,
+                         self.ops.tobytes(), state_digest(snapshot))
+
+
+def replay(log: ReplayLog, catalog: Optional[CardCatalog] = None, verify: bool = True) -> Game:
+    """Rejoue une partie sans IA ni saisie ; vérifie l'état final si verify"""
+    if log.version != REPLAY_VERSION:
+        raise ReplayError(f"Version de replay inconnue : {log.version}")
+
+    game = Game(catalog, seed=log.seed, events=NULL_SINK)
+    for name, *_ in log.roster:
+        game.add_player(Player(name, game.catalog))
+    players, cards = game.players, game.catalog
+
+    ops = array('h')
+    ops.frombytes(log.ops)
+    i, n = 0, len(ops)
+    try:
+        while i < n:
+            op, player = ops[i], players[ops[i + 1]]
+            if op == OP_DRAW:
+                player.piocher(ops[i + 2])
+                i += 3
+            elif op == OP_DISCARD:
+                count = ops[i + 2]
+                player.discard([cards[card_id].name for card_id in ops[i + 3:i + 3 + count]])
+                i += 3 + count
+            elif op == OP_BUILD:
+                count = ops[i + 3]
+                payment = [cards[card_id].name for card_id in ops[i + 4:i + 4 + count]]
+                if not player.build(cards[ops[i + 2]].name, payment):
+                    raise ReplayError(f"Construction impossible à la position {i}")
+                i += 4 + count
+            elif op == OP_NEXT:
+                game.next_turn()
+                if game.current_player_index == 0:
+                    game.turn_counter += 1
+                i += 2
+            else:
+                raise ReplayError(f"Opération inconnue {op} à la position {i}")
+    except (ValueError, IndexError) as e:
+        raise ReplayError(f"Le replay diverge à la position {i} : {e}") from e
+
+    for player in players:
+        player.calc_score()
+    if verify and state_digest(game.snapshot()) != log.digest:
+        raise ReplayError("L'état final ne correspond pas à l'enregistrement")
+    return game
+
+
+def record_ai_game(personalities: List[AIPersonality], seed: int,
+                   max_turns: Optional[int] = None) -> Tuple[Game, ReplayLog]:
+    """Joue une partie entre IAs (comme AITester.play_ai_game) en l'enregistrant"""
+    recorder = ReplayRecorder()
+    game = AITester.play_ai_game(personalities, seed, max_turns, recorder=recorder)
+    return game, recorder.finish()
+
+
+def save_replays(path: str, logs) -> int:
+    """Ajoute des replays à un fichier (un enregistrement pickle par partie)"""
+    count = 0
+    with open(path, "ab") as f:
+        for log in logs:
+            pickle.dump(tuple(log), f, protocol=pickle.HIGHEST_PROTOCOL)
+            count += 1
+    return count
+
+
+def load_replays(path: str) -> Iterator[ReplayLog]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield ReplayLog(*pickle.load(f))
+            except EOFError:
+                return
+
+
+def record_battle(path: str, personalities: List[AIPersonality], nb_games: int,
+                  seed: int = 0, max_turns: Optional[int] = None) -> int:
+    """Joue et enregistre une série de parties (mêmes graines que run_ai_battle)"""
+    return save_replays(path, (record_ai_game(personalities, game_seed, max_turns)[1]
+                               for game_seed in _game_seeds(seed, nb_games)))
+
+
+def replay_all(path: str, catalog: Optional[CardCatalog] = None) -> Tuple[int, List[Tuple[int, str]]]:
+    """Rejoue tout un fichier ; retourne (parties rejouées, [(numéro, erreur)])"""
+    failures = []
+    count = 0
+    for number, log in enumerate(load_replays(path)):
+        count += 1
+        try:
+            replay(log, catalog)
+        except ReplayError as e:
+            failures.append((number, str(e)))
+    return count, failures
+
+
+if __name__ == "__main__":
+    # Régression : python replay.py parties.replay
+    replayed, errors = replay_all(sys.argv[1])
+    for number, error in errors:
+        print(f"❌ Partie {number} : {error}")
+    print(f"{replayed - len(errors)}/{replayed} parties rejouées à l'identique")
+    sys.exit(1 if errors else 0)
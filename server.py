@@ -0,0 +1,410 @@
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from gameio import EventSink, ScriptedDecisions, Verbosity
+from simulation import DEFAULT_RULES, AIPersonality, AIPlayer, Game, Player, Rules
+
+
+# Protocole : un objet JSON par ligne dans chaque sens.
+# Client -> serveur :
+#   {"op": "create", "ais": ["aggressive", ...], "humans": 1, "name": "Alice",
+#    "seed": 42, "level": "info", "rules": {"max_cards": 10}}    (name : rejoindre la table créée)
+#   {"op": "join", "table": 3, "name": "Bob"}
+#   {"op": "answer", "id": 17, "value": ...}                     (réponse à une question "ask")
+#   {"op": "tables"} / {"op": "stats"} / {"op": "leave"}
+# Serveur -> client :
+#   {"op": "created" | "joined", "table": 3, "seat": 0}
+#   {"op": "ask", "id": 17, "kind": "action" | "card" | "payment" | "discard", ...}
+#     (payment / discard : "cards", "count" et "suggested", les positions conseillées par discard.py)
+#   {"op": "event", "level": 20, "text": "..."}
+#   {"op": "over", "table": 3, "scores": [["Alice", 12], ...]}
+#   {"op": "closed", "table": 3, "reason": "..."} / {"op": "error", "message": "..."}
+
+DEFAULT_PORT = 8765
+
+# Les sièges distants ne doivent jamais atteindre une saisie bloquante du moteur
+_REMOTE_DECISIONS = ScriptedDecisions(())
+
+# Bornes des règles envoyées par un client : la partie doit rester jouable et se terminer
+_RULE_BOUNDS = {
+    "max_cards": (1, 100),
+    "initial_cards": (0, 50),
+    "cards_to_draw": (1, 50),
+    "cards_to_discard": (0, 50),
+    "buildings_to_end": (1, 100),
+    "turn_limit": (1, 1000),
+    "battle_turns": (1, 1000),
+}
+
+
+class ProtocolError(Exception):
+    """Message invalide : renvoyé au client, la connexion reste ouverte"""
+
+
+class TableClosed(Exception):
+    """La table s'arrête (joueur parti, délai dépassé)"""
+
+
+def _parse_rules(data) -> Rules:
+    """Règles d'une table créée par un client : champs connus, entiers dans leurs bornes"""
+    if not isinstance(data, dict):
+        raise ProtocolError("Règles invalides : un objet JSON est attendu")
+    for name, value in data.items():
+        if name not in _RULE_BOUNDS:
+            raise ProtocolError(f"Règle inconnue : {name}")
+        low, high = _RULE_BOUNDS[name]
+        if type(value) is not int or not low <= value <= high:  # bool est un int : refusé aussi
+            raise ProtocolError(f"Règle {name} : entier entre {low} et {high} attendu")
+    return DEFAULT_RULES._replace(**data)
+
+
+class Connection:
+    """Client connecté : messages sortants en file, réponses attendues par sa table"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.outbox: "asyncio.Queue[Optional[dict]]" = asyncio.Queue()
+        self.answers: "asyncio.Queue[dict]" = asyncio.Queue()
+        self.table: Optional["Table"] = None
+        self.seat: Optional[int] = None  # None pour un spectateur
+        self.name = ""
+
+    def send(self, message: dict):
+        self.outbox.put_nowait(message)
+
+    async def pump(self):
+        """Écrit les messages en file sur la socket"""
+        while True:
+            message = await self.outbox.get()
+            if message is None:
+                return
+            self.writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+            await self.writer.drain()
+
+
+class TableSink(EventSink):
+    """Diffuse les messages d'une table à ses clients (y compris depuis un thread de l'executor)"""
+
+    def __init__(self, table: "Table", level: Verbosity):
+        super().__init__(level)
+        self.table = table
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+    def write(self, level: Verbosity, text: str):
+        message = {"op": "event", "level": int(level), "text": text}
+        if threading.get_ident() == self._loop_thread:
+            self.table.broadcast(message)
+        else:
+            self.loop.call_soon_threadsafe(self.table.broadcast, message)
+
+
+class Table:
+    """Une partie hébergée : son Game, ses sièges humains et sa tâche asyncio"""
+
+    def __init__(self, server: "GameServer", table_id: int, ais: List[AIPersonality], humans: int,
+                 seed: Optional[int], rules: Optional[Rules], level: Verbosity):
+        self.server = server
+        self.id = table_id
+        self.ais = ais
+        self.humans = humans
+        self.creator: Optional[Connection] = None
+        self.seats: List[Connection] = []
+        self.spectators: List[Connection] = []
+        self.game = Game(seed=seed, events=TableSink(self, level), decisions=_REMOTE_DECISIONS, rules=rules)
+        self.task: Optional[asyncio.Task] = None
+        self._questions = itertools.count(1)
+
+    @property
+    def waiting(self) -> bool:
+        return self.task is None
+
+    def broadcast(self, message: dict):
+        for conn in itertools.chain(self.seats, self.spectators):
+            conn.send(message)
+
+    def join(self, conn: Connection, name: Optional[str]):
+        """Assoit un humain (ou ajoute un spectateur sans nom) ; lance la partie quand la table est pleine"""
+        if name is None:
+            self.spectators.append(conn)
+        else:
+            if not self.waiting or len(self.seats) >= self.humans:
+                raise ProtocolError(f"La table {self.id} est complète")
+            conn.seat, conn.name = len(self.seats), name
+            self.seats.append(conn)
+        conn.table = self  # Seulement une fois la place prise : un refus laisse le client libre
+        conn.send({"op": "joined", "table": self.id, "seat": conn.seat})
+        if self.waiting and len(self.seats) == self.humans:
+            self.task = asyncio.create_task(self.play())
+
+    def leave(self, conn: Connection):
+        if conn in self.spectators:
+            self.spectators.remove(conn)
+        elif conn in self.seats:
+            self.close(f"{conn.name} a quitté la table")
+
+    def close(self, reason: str):
+        self.broadcast({"op": "closed", "table": self.id, "reason": reason})
+        if self.task is not None and not self.task.done() and self.task is not asyncio.current_task():
+            self.task.cancel()
+        self._release()
+
+    def _release(self):
+        """Retire la table du serveur ; ses clients peuvent en créer ou rejoindre une autre"""
+        for conn in itertools.chain(self.seats, self.spectators):
+            conn.table, conn.seat = None, None
+        self.server.tables.pop(self.id, None)
+
+    async def play(self):
+        """Boucle de jeu de Game._run, avec des tours humains asynchrones"""
+        game = self.game
+        try:
+            for conn in self.seats:
+                game.add_player(Player(conn.name, game.catalog, _REMOTE_DECISIONS))
+            for personality in self.ais:
+                game.add_ai_player(f"IA-{personality.value.capitalize()}", personality)
+            for player in game.players:
+                player.piocher(game.rules.initial_cards)
+
+            while not game._check_end_conditions():
+                current = game.current_player()
+                game._display_game_status()
+                if isinstance(current, AIPlayer):
+                    await self.server.play_ai_turn(game, current)
+                else:
+                    await self._human_turn(game.current_player_index, current)
+                game.next_turn()
+                if game.current_player_index == 0:
+                    game.turn_counter += 1
+
+            game._display_final_scores()
+            self.broadcast({"op": "over", "table": self.id,
+                            "scores": [[player.name, player.point] for player in game.players]})
+            self.server.games_completed += 1
+            self._release()
+        except TableClosed as e:
+            self.close(str(e))
+        except Exception as e:  # Une table en erreur ne doit pas arrêter les autres
+            self.close(f"Erreur du serveur : {e}")
+
+    # --- Tour d'un humain (version asynchrone de Game._handle_human_turn) ---
+
+    async def _ask(self, seat: int, kind: str, **payload):
+        """Pose une question au siège et attend sa réponse (les réponses périmées sont ignorées)"""
+        conn = self.seats[seat]
+        question = next(self._questions)
+        conn.send({"op": "ask", "id": question, "kind": kind, **payload})
+        while True:
+            try:
+                answer = await asyncio.wait_for(conn.answers.get(), self.server.turn_timeout)
+            except asyncio.TimeoutError:
+                raise TableClosed(f"{conn.name} n'a pas répondu à temps") from None
+            if answer.get("id") == question:
+                return answer.get("value")
+
+    async def _ask_indices(self, seat: int, kind: str, cards: List[str], count: int) -> List[int]:
+        """Positions distinctes de `count` cartes de `cards`, redemandées tant qu'elles sont invalides"""
+        suggested = self.game.players[seat].suggest_discards(cards, count)
+        while True:
+            answer = await self._ask(seat, kind, cards=cards, count=count, suggested=suggested)
+            try:
+                indices = [int(i) for i in answer]
+            except (TypeError, ValueError):
+                indices = []
+            if len(indices) == count and len(set(indices)) == count and all(0 <= i < len(cards) for i in indices):
+                return indices
+            self.seats[seat].send({"op": "error", "message": f"Il faut {count} positions distinctes parmi {len(cards)}"})
+
+    async def _human_turn(self, seat: int, player: Player):
+        game, events = self.game, self.game.events
+        events.info("C'est le tour de {}", player.name)
+
+        money = player.calc_money()
+        if money > 0:
+            player.piocher(money)
+            events.info("{} pioche {} carte(s) grâce à son argent.", player.name, money)
+
+        while True:
+            buildable = player.get_buildable_cards()
+            choice = str(await self._ask(seat, "action", state=game.create_game_state(),
+                                         hand=list(player.deck), buildable=buildable)).strip().lower()
+            if choice == "piocher":
+                await self._draw_action(seat, player)
+                break
+            if choice == "construire":
+                if not buildable:
+                    self.seats[seat].send({"op": "error", "message": "Aucune carte constructible"})
+                    continue
+                if await self._build_action(seat, player, buildable):
+                    break
+                continue
+            if choice != "info":  # "info" : la question suivante contient l'état à jour
+                self.seats[seat].send({"op": "error", "message": "Choix invalide : piocher, construire ou info"})
+
+        player.calc_score()
+
+    async def _draw_action(self, seat: int, player: Player):
+        rules = self.game.rules
+        drawn = player.piocher(rules.cards_to_draw)
+        nb_to_discard = min(rules.cards_to_discard, max(len(drawn) - 1, 0))
+        if nb_to_discard:
+            indices = await self._ask_indices(seat, "discard", drawn, nb_to_discard)
+            player.discard([drawn[i] for i in indices])
+
+    async def _build_action(self, seat: int, player: Player, buildable) -> bool:
+        carte = str(await self._ask(seat, "card", buildable=buildable)).strip()
+        cost = dict(buildable).get(carte)
+        if cost is None:
+            self.seats[seat].send({"op": "error", "message": f"{carte} n'est pas constructible"})
+            return False
+
+        # Le paiement se choisit parmi les autres cartes de la main
+        others = list(player.deck)
+        others.remove(carte)
+        payment = []
+        if cost:
+            payment = [others[i] for i in await self._ask_indices(seat, "payment", others, cost)]
+        if not player.build(carte, payment):
+            return False
+
+        # Limite de main (version asynchrone de Player.check_carte)
+        excess = len(player.deck) - self.game.rules.max_cards
+        if excess > 0:
+            hand = list(player.deck)
+            player.discard([hand[i] for i in await self._ask_indices(seat, "discard", hand, excess)])
+        return True
+
+
+class GameServer:
+    """Héberge de nombreuses tables dans une seule boucle asyncio"""
+
+    def __init__(self, turn_timeout: Optional[float] = None, ai_threads: int = 1):
+        self.tables: Dict[int, Table] = {}
+        self.turn_timeout = turn_timeout  # secondes par question, None : pas de limite
+        self.games_completed = 0
+        self._ids = itertools.count(1)
+        # Les IA lentes (MCTS) jouent dans un thread pour ne pas figer les autres tables
+        self.executor = ThreadPoolExecutor(max_workers=ai_threads, thread_name_prefix="ai")
+
+    async def play_ai_turn(self, game: Game, player: AIPlayer):
+        if player.personality is AIPersonality.MCTS:
+            await asyncio.get_running_loop().run_in_executor(self.executor, game._handle_ai_turn, player)
+        else:
+            game._handle_ai_turn(player)
+            await asyncio.sleep(0)  # Laisse jouer les autres tables entre deux tours
+
+    def create_table(self, message: dict) -> Table:
+        try:
+            ais = [AIPersonality(name) for name in message.get("ais", [])]
+            humans = int(message.get("humans", 1))
+            level = Verbosity[str(message.get("level", "info")).upper()]
+            rules = _parse_rules(message["rules"]) if message.get("rules") else None
+            seed = message.get("seed")
+            seed = None if seed is None else int(seed)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ProtocolError(f"Table invalide : {e}") from None
+        if humans < 0 or humans + len(ais) < 2:
+            raise ProtocolError("Il faut au moins deux joueurs")
+        return Table(self, next(self._ids), ais, humans, seed, rules, level)
+
+    def _dispatch(self, conn: Connection, message: dict):
+        op = message.get("op")
+        if op == "answer":
+            conn.answers.put_nowait(message)
+        elif op == "create":
+            if conn.table is not None:
+                raise ProtocolError("Déjà assis à une table")
+            table = self.create_table(message)
+            table.creator = conn
+            conn.send({"op": "created", "table": table.id})
+            name = message.get("name")
+            if name is not None or table.humans == 0:
+                table.join(conn, None if name is None else str(name))
+            # Enregistrée seulement une fois son créateur installé : un refus ne laisse pas de table orpheline
+            self.tables[table.id] = table
+        elif op == "join":
+            table = self.tables.get(message.get("table"))
+            if table is None:
+                raise ProtocolError("Table inconnue")
+            if conn.table is not None:
+                raise ProtocolError("Déjà assis à une table")
+            name = message.get("name")
+            table.join(conn, None if name is None else str(name))
+        elif op == "leave":
+            if conn.table is not None:
+                conn.table.leave(conn)
+                conn.table, conn.seat = None, None
+        elif op == "tables":
+            conn.send({"op": "tables", "tables": [
+                {"table": t.id, "humans": t.humans, "seated": len(t.seats), "ais": [p.value for p in t.ais]}
+                for t in self.tables.values() if t.waiting
+            ]})
+        elif op == "stats":
+            conn.send({"op": "stats", "tables": len(self.tables), "games_completed": self.games_completed})
+        else:
+            raise ProtocolError(f"Opération inconnue : {op}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Une connexion client : lit les messages, les route, et nettoie à la déconnexion"""
+        conn = Connection(writer)
+        pump = asyncio.create_task(conn.pump())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ProtocolError("Un objet JSON est attendu")
+                    self._dispatch(conn, message)
+                except (ProtocolError, json.JSONDecodeError) as e:
+                    conn.send({"op": "error", "message": str(e)})
+        except ConnectionError:
+            pass
+        finally:
+            if conn.table is not None:
+                conn.table.leave(conn)
+            # Une table encore en attente n'a plus personne pour la remplir quand son créateur s'en va
+            for table in [t for t in self.tables.values() if t.creator is conn and t.waiting]:
+                table.close("Le créateur de la table s'est déconnecté")
+            conn.outbox.put_nowait(None)
+            try:
+                await pump
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def _main(host: str, port: int, turn_timeout: Optional[float]):
+    server = GameServer(turn_timeout)
+    listener = await server.serve(host, port)
+    print(f"🏛️  Serveur de jeu sur {host}:{port}", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serveur de parties (JSON par ligne sur TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--turn-timeout", type=float, default=None, help="secondes par question")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main(args.host, args.port, args.turn_timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,150 +1,366 @@
+import math
+import os
 import random
-import sqlite3
-from typing import List, Tuple, Optional
-from contextlib import contextmanager
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Optional
 
+import profiling
+from catalog import COLORS, Card, CardCatalog, CardMultiset
+from discard import DiscardOptimizer, HandValuation, intrinsic_value
+from gameio import CONSOLE, CONSOLE_DECISIONS, NULL_SINK, DecisionProvider, EventSink, Verbosity
+from outcomes import GameOutcome, OutcomeWriter
+from stats import BattleStats
 
-@contextmanager
-def get_db_connection():
-    """Context manager pour gérer les connexions à la base de données"""
-    conn = sqlite3.connect('city.db')
-    try:
-        yield conn
-    finally:
-        conn.close()
+
+class Rules(NamedTuple):
+    """Règles de la partie, lues par le moteur (variantes : DEFAULT_RULES._replace(...))"""
+    max_cards: int = 12         # Cartes en main au-delà desquelles il faut défausser
+    initial_cards: int = 5      # Distribution initiale
+    cards_to_draw: int = 5      # Action piocher : cartes tirées...
+    cards_to_discard: int = 4   # ...dont celles qu'il faut défausser
+    buildings_to_end: int = 8   # Taille de ville qui termine la partie
+    turn_limit: int = 50        # Limite de sécurité de toute partie
+    battle_turns: int = 30      # Limite des parties entre IAs
+
+
+DEFAULT_RULES = Rules()
 
 
 class Pioche:
     """Gère la pioche et la défausse du jeu"""
     
-    def __init__(self):
-        self.pioche: List[str] = []
-        self.defausse: List[str] = []
-        self._load_cards_from_db()
-    
-    def _load_cards_from_db(self):
-        """Charge les cartes depuis la base de données"""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name, how_many FROM users")
-            list_pioche = cursor.fetchall()
-            
-            for name, count in list_pioche:
-                self.pioche.extend([name] * count)
+    # Toutes les cartes hors des mains et des villes vivent dans un anneau d'ids
+    # préalloué : la pioche commence à _start, la défausse la suit immédiatement.
+    
+    __slots__ = ("catalog", "rng", "_initial", "_cards", "_start", "_pile_len", "_discard_len")
+    
+    def __init__(self, catalog: Optional[CardCatalog] = None, seed: Optional[int] = None):
+        self.catalog: CardCatalog = catalog if catalog is not None else CardCatalog.default()
+        self.rng: random.Random = random.Random(seed)
+        self._initial = array('H')  # Cartes dans l'ordre du catalogue, avant mélange
+        self._cards = array('H')
+        self._start: int = 0
+        self._pile_len: int = 0
+        self._discard_len: int = 0
+        self._load_cards_from_catalog()
+    
+    def _load_cards_from_catalog(self):
+        """Charge les cartes depuis le catalogue partagé"""
+        for card in self.catalog:
+            self._initial.extend([card.id] * card.how_many)
+        self._cards = array('H', self._initial)
+        self._pile_len = len(self._cards)
+        self._shuffle(0, self._pile_len)  # Mélanger dès le départ
+    
+    def reset(self, seed: Optional[int] = None):
+        """Remet toutes les cartes dans la pioche et la mélange, comme une pioche neuve de même graine"""
+        self.rng.seed(seed)
+        self._cards[:] = self._initial
+        self._start, self._pile_len, self._discard_len = 0, len(self._cards), 0
+        self._shuffle(0, self._pile_len)
+    
+    def _shuffle(self, start: int, length: int):
+        """Mélange sur place une portion de l'anneau (Fisher-Yates)"""
+        cards, size, randbelow = self._cards, len(self._cards), self.rng.randrange
+        for i in range(length - 1, 0, -1):
+            j = randbelow(i + 1)
+            a, b = (start + i) % size, (start + j) % size
+            cards[a], cards[b] = cards[b], cards[a]
+    
+    def pioche_id(self) -> int:
+        """Pioche l'id d'une carte, en remélangeant la défausse si nécessaire"""
+        if not self._pile_len:
+            if not self._discard_len:
+                raise ValueError("Plus de cartes disponibles !")
+            # La défausse commence là où la pioche vide s'arrête : elle devient la pioche
+            self._shuffle(self._start, self._discard_len)
+            self._pile_len, self._discard_len = self._discard_len, 0
+            profiling.PROFILER.count("reshuffles")
         
-        random.shuffle(self.pioche)  # Mélanger dès le départ
+        profiling.PROFILER.count("cards_drawn")
+        card_id = self._cards[self._start]
+        self._start = (self._start + 1) % len(self._cards)
+        self._pile_len -= 1
+        return card_id
     
     def pioche_aleatoire(self) -> str:
         """Pioche une carte aléatoirement"""
-        if not self.pioche:
-            if not self.defausse:
-                raise ValueError("Plus de cartes disponibles !")
-            self.pioche = self.defausse[:]
-            self.defausse = []
-            random.shuffle(self.pioche)
-        
-        return self.pioche.pop()  # Plus efficace que remove()
+        return self.catalog[self.pioche_id()].name
+    
+    def defausser_id(self, card_id: int):
+        """Place une carte sur la défausse"""
+        if self._pile_len + self._discard_len >= len(self._cards):
+            raise ValueError("Défausse pleine : carte en trop dans le jeu")
+        position = (self._start + self._pile_len + self._discard_len) % len(self._cards)
+        self._cards[position] = card_id
+        self._discard_len += 1
+    
+    def defausser(self, carte: str):
+        """Place une carte (par son nom) sur la défausse"""
+        card_id = self.catalog.id_of(carte)
+        if card_id is None:
+            raise ValueError(f"Carte inconnue : {carte}")
+        self.defausser_id(card_id)
+    
+    def remettre_et_melanger(self, card_ids: Sequence[int]):
+        """Remet des cartes dans la pioche et la mélange entière (ex. mains inconnues redistribuées en simulation)"""
+        size = len(self._cards)
+        if self._pile_len + self._discard_len + len(card_ids) > size:
+            raise ValueError("Pioche pleine : carte en trop dans le jeu")
+        for card_id in card_ids:
+            self._start = (self._start - 1) % size
+            self._cards[self._start] = card_id
+        self._pile_len += len(card_ids)
+        self._shuffle(self._start, self._pile_len)
+    
+    @property
+    def defausse(self) -> List[str]:
+        """Cartes de la défausse (copie en lecture seule)"""
+        size = len(self._cards)
+        first = self._start + self._pile_len
+        return [self.catalog[self._cards[(first + i) % size]].name for i in range(self._discard_len)]
+    
+    def cards_remaining(self) -> int:
+        """Nombre de cartes restant dans la pioche"""
+        return self._pile_len
+    
+    def snapshot(self) -> tuple:
+        """État compact : anneau d'ids, positions et état du générateur aléatoire"""
+        return self._cards.tobytes(), self._start, self._pile_len, self._discard_len, self.rng.getstate()
+    
+    def restore(self, state: tuple):
+        """Remet la pioche dans un état produit par snapshot()"""
+        cards, self._start, self._pile_len, self._discard_len, rng_state = state
+        self._cards = array('H', cards)
+        self.rng.setstate(rng_state)
+
+
+class SeatRandom(random.Random):
+    """Générateur d'un joueur à état compact : graine et nombre de tirages (splitmix64 par compteur)"""
+    
+    # Les IA tirent peu (erreurs de difficulté) : un générateur en Python pur suffit, et un snapshot
+    # n'en garde que deux entiers au lieu des 625 mots de l'état de Mersenne Twister
+    
+    _MASK = (1 << 64) - 1
+    
+    def __init__(self, seed: Optional[int] = None):
+        self._seed: int = 0
+        self._count: int = 0
+        super().__init__(seed)
+    
+    def seed(self, a=None, version: int = 2):
+        self._seed = random.getrandbits(64) if a is None else a & self._MASK
+        self._count = 0
+        self.gauss_next = None
+    
+    def getrandbits(self, k: int) -> int:
+        mask, bits, filled = self._MASK, 0, 0
+        while filled < k:
+            self._count += 1
+            z = (self._seed + self._count * 0x9E3779B97F4A7C15) & mask
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & mask
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & mask
+            bits |= (z ^ (z >> 31)) << filled
+            filled += 64
+        return bits & ((1 << k) - 1)
+    
+    def random(self) -> float:
+        return self.getrandbits(53) * 2.0 ** -53
+    
+    def getstate(self) -> Tuple[int, int]:
+        return self._seed, self._count
+    
+    def setstate(self, state: Tuple[int, int]):
+        self._seed, self._count = state
 
 
 class Player:
     """Représente un joueur du jeu"""
     
-    def __init__(self, name: str):
-        self.deck: List[str] = []
-        self.city: List[str] = []
+    is_ai: bool = False
+    
+    __slots__ = ("catalog", "deck", "city", "point", "name", "rng", "_pioche", "decisions", "events",
+                 "recorder", "rules", "_buildable_cache", "_keep_cache", "_specials", "_points_by_color",
+                 "_money_by_color", "_flat_points", "_flat_money")
+    
+    def __init__(self, name: str, catalog: Optional[CardCatalog] = None,
+                 decisions: Optional[DecisionProvider] = None):
+        self.catalog: CardCatalog = catalog if catalog is not None else CardCatalog.default()
+        self.deck: CardMultiset = CardMultiset(self.catalog)
+        self.city: CardMultiset = CardMultiset(self.catalog)
         self.point: int = 0
         self.name: str = name
+        self.rng: random.Random = SeatRandom()
         self._pioche = None  # Sera injecté
+        self.decisions: DecisionProvider = decisions if decisions is not None else CONSOLE_DECISIONS
+        self.events: EventSink = CONSOLE  # Remplacé par celui de la partie
+        self.recorder = None  # Enregistreur de la partie (replay.ReplayRecorder), injecté
+        self.rules: Rules = DEFAULT_RULES  # Remplacées par celles de la partie
+        self._buildable_cache: Optional[Tuple[tuple, List[Tuple[str, int]]]] = None
+        self._keep_cache: Optional[Tuple[tuple, HandValuation]] = None
+        
+        # Compteurs mis à jour à chaque construction (score et argent en O(1))
+        self._specials = {color: 0 for color in COLORS}
+        self._points_by_color = {color: 0 for color in COLORS}
+        self._money_by_color = {color: 0 for color in COLORS}
+        self._flat_points: int = 0
+        self._flat_money: int = 0
     
     def set_pioche(self, pioche: Pioche):
-        """Injecte la dépendance pioche"""
+        """Injecte la dépendance pioche (avec son catalogue et son générateur aléatoire)"""
         self._pioche = pioche
+        # Générateur propre au joueur, dérivé de celui de la partie : les tirages des IA ne
+        # décalent pas les mélanges de la pioche, qu'un replay rejoue sans les IA
+        self.rng.seed(pioche.rng.getrandbits(32))
+        if pioche.catalog is not self.catalog:
+            self.catalog = pioche.catalog
+            self.deck = CardMultiset(self.catalog, self.deck)
+            self.city = CardMultiset(self.catalog, self.city)
     
-    def piocher(self, nb_cartes: int):
-        """Pioche un nombre donné de cartes"""
+    def piocher(self, nb_cartes: int) -> List[str]:
+        """Pioche un nombre donné de cartes et retourne les cartes piochées"""
         if not self._pioche:
             raise ValueError("Pioche non initialisée")
-            
+        
+        drawn = []
         for _ in range(nb_cartes):
             try:
                 item = self._pioche.pioche_aleatoire()
                 self.deck.append(item)
+                drawn.append(item)
             except ValueError as e:
-                print(f"Erreur lors de la pioche : {e}")
+                self.events.warning("Erreur lors de la pioche : {}", e)
                 break
+        if self.recorder is not None:
+            self.recorder.draw(self, nb_cartes)
+        return drawn
+    
+    def discard(self, cartes: List[str]):
+        """Défausse des cartes de la main"""
+        for carte in cartes:
+            self.deck.remove(carte)
+            self._pioche.defausser(carte)
+        if self.recorder is not None:
+            self.recorder.discard(self, cartes)
     
-    def _get_card_info(self, carte: str) -> Optional[Tuple]:
-        """Récupère les informations d'une carte depuis la DB"""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT price, reduction_if, can_build_if FROM users WHERE name = ?",
-                (carte,)
-            )
-            return cursor.fetchone()
+    def _get_card_info(self, carte: str) -> Optional[Card]:
+        """Récupère la fiche d'une carte depuis le catalogue"""
+        return self.catalog.get(carte)
     
     def check_if_can_build(self, carte: str) -> Tuple[bool, Optional[int]]:
         """Vérifie si on peut construire une carte"""
-        result = self._get_card_info(carte)
+        card_info = self._get_card_info(carte)
         
-        if result is None:
-            print(f"La carte {carte} n'existe pas.")
+        if card_info is None:
+            self.events.warning("La carte {} n'existe pas.", carte)
             return False, None
         
-        price, reduction, can_build_if = result
-        
         if carte not in self.deck:
-            print(f"La carte {carte} n'est pas dans ton deck.")
+            self.events.warning("La carte {} n'est pas dans ton deck.", carte)
             return False, None
         
-        # Calcul des réductions
-        if reduction:
-            reduction_cards = [item.strip() for item in reduction.split(",")]
-            for card in reduction_cards:
-                if card in self.city and price > 0:
-                    price -= 1
+        price = self._effective_price(card_info)
         
         # Vérification du nombre de cartes disponibles
         if price + 1 > len(self.deck):
-            manque = (price + 1) - len(self.deck)
-            print(f"Tu n'as pas assez de cartes. Il te manque {manque} carte(s).")
+            self.events.warning("Tu n'as pas assez de cartes. Il te manque {} carte(s).",
+                                (price + 1) - len(self.deck))
             return False, None
         
-        # Vérification des prérequis
-        if can_build_if and can_build_if not in self.city:
-            print(f"Tu dois construire {can_build_if} avant de construire {carte} !")
+        # Vérification des prérequis (un seul des bâtiments listés suffit)
+        if not self._has_prerequisites(card_info):
+            self.events.warning("Tu dois construire {} avant de construire {} !",
+                                " ou ".join(card_info.prerequisites), carte)
             return False, None
         
         return True, price
     
-    def _select_cards_to_discard(self, nb_required: int) -> List[int]:
-        """Sélectionne les cartes à défausser (interface utilisateur)"""
+    def _effective_price(self, card_info: Card) -> int:
+        """Prix après réductions : une carte en moins par bâtiment listé présent dans la ville"""
+        city_mask = self.city.mask
+        reduction = sum((city_mask & mask).bit_count() for mask in card_info.reduction_masks)
+        return max(card_info.price - reduction, 0)
+    
+    def _has_prerequisites(self, card_info: Card) -> bool:
+        """Vrai si la carte n'a pas de prérequis ou si l'un d'eux est construit"""
+        return not card_info.prerequisites or bool(self.city.mask & card_info.prerequisite_mask)
+    
+    def get_buildable_cards(self) -> List[Tuple[str, int]]:
+        """Cartes constructibles de la main avec leur coût effectif (résultat partagé, ne pas modifier)"""
+        # Recalculé seulement quand la main ou la ville a changé
+        state = (self.deck, self.deck.version, self.city, self.city.version)
+        if self._buildable_cache is not None and self._buildable_cache[0] == state:
+            return self._buildable_cache[1]
+        
+        # Une seule passe sur les cartes distinctes de la main, masques et popcount
+        catalog, city_mask, hand_size = self.catalog, self.city.mask, len(self.deck)
+        buildable = []
+        for card_id in self.deck.ids():
+            card_info = catalog[card_id]
+            if card_info.prerequisites and not city_mask & card_info.prerequisite_mask:
+                continue
+            reduction = sum((city_mask & mask).bit_count() for mask in card_info.reduction_masks)
+            cost = max(card_info.price - reduction, 0)
+            if cost + 1 <= hand_size:
+                buildable.append((card_info.name, cost))
+        
+        self._buildable_cache = (state, buildable)
+        return buildable
+    
+    def valuation_weights(self) -> Tuple[float, float, float, float, float]:
+        """Poids du modèle de valeur des cartes (conseils aux humains : ceux de la personnalité équilibrée)"""
+        return AIPlayer.WEIGHTS[AIPersonality.BALANCED]
+    
+    def hand_valuation(self) -> HandValuation:
+        """Valeur de garder chaque carte de la main (recalculée seulement quand la main ou la ville a changé)"""
+        weights = self.valuation_weights()
+        state = (self.deck, self.deck.version, self.city, self.city.version, weights)
+        if self._keep_cache is not None and self._keep_cache[0] == state:
+            return self._keep_cache[1]
+        
+        valuation = DiscardOptimizer.for_catalog(self.catalog).valuation(
+            self.deck, self.city, self._specials, self._points_by_color, self._money_by_color, weights)
+        self._keep_cache = (state, valuation)
+        return valuation
+    
+    def suggest_discards(self, cards: Sequence[str], nb_cards: int, keep: Optional[str] = None) -> List[int]:
+        """Positions des cartes de `cards` (toutes en main) qui coûtent le moins à donner ou défausser"""
+        if nb_cards <= 0:
+            return []
+        return self.hand_valuation().discards(cards, nb_cards, keep)
+    
+    def _select_cards_to_discard(self, nb_required: int, keep: Optional[str] = None) -> List[int]:
+        """Sélectionne les cartes à défausser (interface utilisateur ; keep : carte construite)"""
         while True:
-            print(f"Tu dois utiliser {nb_required} carte(s) :")
-            available_cards = [(i, c) for i, c in enumerate(self.deck)]
+            self.events.info("Tu dois utiliser {} carte(s) :", nb_required)
+            available_cards = list(self.deck)
             
-            for i, c in available_cards:
-                print(f"{i}: {c}")
+            for i, c in enumerate(available_cards):
+                self.events.info("{}: {}", i, c)
+            if self.events.enabled(Verbosity.INFO):
+                suggested = sorted(self.suggest_discards(available_cards, nb_required, keep))
+                self.events.info("💡 Conseil : {}", " ".join(str(i) for i in suggested))
             
             try:
-                choix = input("Entre les numéros : ").split()
-                indices = [int(x) for x in choix]
+                indices = self.decisions.choose_indices(self, available_cards, nb_required, "Entre les numéros : ")
                 
                 if len(indices) != nb_required:
-                    print(f"{len(indices)} carte(s) sélectionnées, mais {nb_required} requises.")
+                    self.events.warning("{} carte(s) sélectionnées, mais {} requises.", len(indices), nb_required)
                     continue
                 
-                # Vérifier que tous les indices sont valides
-                if all(0 <= i < len(self.deck) for i in indices):
+                # Vérifier que tous les indices sont valides et distincts
+                if all(0 <= i < len(self.deck) for i in indices) and len(set(indices)) == len(indices):
                     return indices
                 else:
-                    print("Indices invalides.")
+                    self.events.warning("Indices invalides.")
                     
             except ValueError:
-                print("Entrée invalide.")
+                self.events.warning("Entrée invalide.")
     
-    def build(self, carte: str) -> bool:
-        """Construit une carte"""
+    def build(self, carte: str, payment: Optional[List[str]] = None) -> bool:
+        """Construit une carte (payment : cartes de paiement, sinon demandées au joueur)"""
         can_build, price = self.check_if_can_build(carte)
         if not can_build:
             return False
@@ -152,121 +368,399 @@ class Player:
         if price == 0:
             # Construction gratuite
             self.deck.remove(carte)
-            self.city.append(carte)
-            print(f"Carte {carte} construite gratuitement.")
+            self._add_to_city(carte)
+            profiling.PROFILER.count("builds")
+            if self.recorder is not None:
+                self.recorder.build(self, carte, [])
+            self.events.info("Carte {} construite gratuitement.", carte)
             return True
         
-        indices = self._select_cards_to_discard(price)
+        if payment is None:
+            indices = self._select_cards_to_discard(price, keep=carte)
+            payment = [self.deck[i] for i in indices]
         
-        # Défausser les cartes sélectionnées (en ordre décroissant pour éviter les problèmes d'index)
+        # Défausser les cartes sélectionnées
         cartes_utilisees = []
-        for i in sorted(indices, reverse=True):
-            if i < len(self.deck):  # Sécurité supplémentaire
-                carte_defaussee = self.deck.pop(i)
-                self._pioche.defausse.append(carte_defaussee)
-                cartes_utilisees.append(carte_defaussee)
+        for carte_defaussee in payment:
+            self.deck.remove(carte_defaussee)
+            self._pioche.defausser(carte_defaussee)
+            cartes_utilisees.append(carte_defaussee)
         
         # Construire la carte
         self.deck.remove(carte)
-        self.city.append(carte)
+        self._add_to_city(carte)
         
-        print(f"Carte {carte} construite avec succès.")
-        print(f"Cartes utilisées : {', '.join(cartes_utilisees)}")
+        profiling.PROFILER.count("builds")
+        if self.recorder is not None:
+            self.recorder.build(self, carte, cartes_utilisees)
+        self.events.info("Carte {} construite avec succès.", carte)
+        if self.events.enabled(Verbosity.DEBUG):
+            self.events.debug("Cartes utilisées : {}", ", ".join(cartes_utilisees))
         return True
     
+    def _add_to_city(self, carte: str):
+        """Ajoute une carte à la ville et met à jour les compteurs"""
+        self.city.append(carte)
+        
+        card_info = self.catalog.get(carte)
+        if card_info is None:
+            return
+        
+        for color in COLORS:
+            self._specials[color] += card_info.special(color)
+        
+        if card_info.points_color:
+            self._points_by_color[card_info.points_color] += 1
+        else:
+            self._flat_points += card_info.points
+        
+        if card_info.money_color:
+            self._money_by_color[card_info.money_color] += 1
+        else:
+            self._flat_money += card_info.money
+    
     def _calculate_special_points(self, color: str) -> int:
         """Calcule les points spéciaux pour une couleur donnée"""
-        points = 0
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            for card in self.city:
-                cursor.execute(f"SELECT special_{color} FROM users WHERE name = ?", (card,))
-                result = cursor.fetchone()
-                if result and result[0]:
-                    points += int(result[0])
-        return points
+        return self._specials[color]
     
     def calc_score(self):
         """Calcule le score du joueur"""
-        self.point = 0
+        self.point = self._flat_points + sum(
+            count * self._specials[color] for color, count in self._points_by_color.items()
+        )
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            for card in self.city:
-                cursor.execute("SELECT points FROM users WHERE name = ?", (card,))
-                result = cursor.fetchone()
-                
-                if not result:
-                    continue
-                
-                points = result[0]
-                
-                if str(points).isdigit():
-                    self.point += int(points)
-                elif points in ("red", "green", "blue"):
-                    self.point += self._calculate_special_points(points)
-        
-        print(f"Points totaux pour {self.name} : {self.point}")
+        self.events.debug("Points totaux pour {} : {}", self.name, self.point)
     
     def calc_money(self) -> int:
         """Calcule l'argent du joueur"""
-        money = 0
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            for card in self.city:
-                cursor.execute("SELECT money FROM users WHERE name = ?", (card,))
-                result = cursor.fetchone()
-                
-                if not result:
-                    continue
-                
-                value = result[0]
-                
-                if str(value).isdigit():
-                    money += int(value)
-                elif value in ("red", "green", "blue"):
-                    money += self._calculate_special_points(value)
-        
-        return money
+        return self._flat_money + sum(
+            count * self._specials[color] for color, count in self._money_by_color.items()
+        )
     
     def check_carte(self):
         """Vérifie et gère la limite de cartes en main"""
-        MAX_CARDS = 12
+        max_cards = self.rules.max_cards
         
-        while len(self.deck) > MAX_CARDS:
-            nb_to_discard = len(self.deck) - MAX_CARDS
-            print(f"Tu as trop de cartes ({len(self.deck)}), tu dois en défausser {nb_to_discard} !")
+        while len(self.deck) > max_cards:
+            nb_to_discard = len(self.deck) - max_cards
+            self.events.warning("Tu as trop de cartes ({}), tu dois en défausser {} !", len(self.deck), nb_to_discard)
             
             indices = self._select_cards_to_discard(nb_to_discard)
             
             # Défausser les cartes sélectionnées
-            for i in sorted(indices, reverse=True):
-                carte_defaussee = self.deck.pop(i)
-                self._pioche.defausse.append(carte_defaussee)
+            self.discard([self.deck[i] for i in indices])
+    
+    def snapshot(self) -> tuple:
+        """État compact : main, ville, score, compteurs et générateur aléatoire (graine, tirages)"""
+        return (self.deck.snapshot(), self.city.snapshot(), self.point,
+                self._flat_points, self._flat_money,
+                tuple(self._specials.values()),
+                tuple(self._points_by_color.values()),
+                tuple(self._money_by_color.values()),
+                self.rng.getstate())
+    
+    def reset(self):
+        """Vide la main, la ville et les compteurs (la partie réinjecte ensuite sa pioche)"""
+        self.deck.clear()
+        self.city.clear()
+        self.point = 0
+        for counters in (self._specials, self._points_by_color, self._money_by_color):
+            for color in counters:
+                counters[color] = 0
+        self._flat_points = 0
+        self._flat_money = 0
+        self._buildable_cache = None
+        self._keep_cache = None
+    
+    def restore(self, state: tuple):
+        """Remet le joueur dans un état produit par snapshot()"""
+        (deck, city, self.point, self._flat_points, self._flat_money,
+         specials, points_by_color, money_by_color, rng_state) = state
+        self.rng.setstate(rng_state)
+        self.deck.restore(deck)
+        self.city.restore(city)
+        self._specials = dict(zip(COLORS, specials))
+        self._points_by_color = dict(zip(COLORS, points_by_color))
+        self._money_by_color = dict(zip(COLORS, money_by_color))
+        self._buildable_cache = None
+        self._keep_cache = None
     
     def __str__(self) -> str:
         return f"Player {self.name} - Deck: {len(self.deck)} cartes, City: {self.city}, Points: {self.point}, Money: {self.calc_money()}"
 
 
+class AIPersonality(Enum):
+    """Personnalités disponibles pour les joueurs IA"""
+    AGGRESSIVE = "aggressive"
+    ECONOMIC = "economic"
+    BALANCED = "balanced"
+    DEFENSIVE = "defensive"
+    OPPORTUNISTIC = "opportunistic"
+    MCTS = "mcts"
+
+
+# Personnalités à poids fixes (MCTS cherche ses coups par simulation, voir mcts.py)
+HEURISTIC_PERSONALITIES: Tuple[AIPersonality, ...] = tuple(
+    personality for personality in AIPersonality if personality is not AIPersonality.MCTS
+)
+
+
+class AIPlayer(Player):
+    """Joueur contrôlé par l'ordinateur"""
+    
+    is_ai = True
+    
+    __slots__ = ("personality", "difficulty", "weights")
+    
+    # Poids (points, argent, spéciaux, coût) et seuil de construction par personnalité
+    WEIGHTS: Dict[AIPersonality, Tuple[float, float, float, float, float]] = {
+        AIPersonality.AGGRESSIVE: (2.0, 0.5, 0.5, 0.3, -5.0),
+        AIPersonality.ECONOMIC: (0.8, 2.0, 0.5, 0.5, 0.0),
+        AIPersonality.BALANCED: (1.0, 1.0, 1.0, 0.5, 0.0),
+        AIPersonality.DEFENSIVE: (1.0, 1.0, 0.5, 1.0, 1.0),
+        AIPersonality.OPPORTUNISTIC: (1.2, 0.8, 1.5, 0.4, 0.0),
+        # Poids de la politique par défaut de MCTS (défausses, carte gardée à la pioche)
+        AIPersonality.MCTS: (1.0, 1.0, 1.0, 0.5, 0.0),
+    }
+    
+    def __init__(self, name: str, personality: AIPersonality = AIPersonality.BALANCED,
+                 difficulty: float = 1.0, catalog: Optional[CardCatalog] = None,
+                 weights: Optional[Tuple[float, float, float, float, float]] = None):
+        super().__init__(name, catalog, decisions=self)
+        self.personality: AIPersonality = personality
+        self.difficulty: float = difficulty
+        # Poids propres au joueur (profil réglé, voir tuning.py), sinon ceux de la personnalité
+        self.weights: Tuple[float, float, float, float, float] = (
+            tuple(weights) if weights is not None else self.WEIGHTS[personality]
+        )
+    
+    def _makes_mistake(self) -> bool:
+        """Une IA facile joue parfois au hasard"""
+        return self.rng.random() < (1.0 - self.difficulty) * 0.5
+    
+    def card_value(self, carte: str) -> float:
+        """Valeur estimée d'une carte pour cette IA"""
+        card_info = self._get_card_info(carte)
+        if card_info is None:
+            return 0.0
+        return intrinsic_value(card_info, self._specials, self.weights)
+    
+    def make_decision(self, game_state: dict) -> str:
+        """Choisit entre piocher et construire"""
+        buildable = self.get_buildable_cards()
+        if not buildable:
+            return "piocher"
+        
+        if self._makes_mistake():
+            return self.rng.choice(["piocher", "construire"])
+        
+        threshold = self.weights[4]
+        w_cost = self.weights[3]
+        best = max(self.card_value(card) - w_cost * cost for card, cost in buildable)
+        
+        # Une main presque pleine pousse à construire quoi qu'il arrive
+        if best >= threshold or len(self.deck) >= self.rules.max_cards - 2:
+            return "construire"
+        return "piocher"
+    
+    def choose_card_to_build(self, game_state: dict) -> Optional[str]:
+        """Choisit la carte à construire parmi les cartes constructibles"""
+        buildable = self.get_buildable_cards()
+        if not buildable:
+            return None
+        
+        if self._makes_mistake():
+            return self.rng.choice(buildable)[0]
+        
+        w_cost = self.weights[3]
+        return max(buildable, key=lambda item: self.card_value(item[0]) - w_cost * item[1])[0]
+    
+    def valuation_weights(self) -> Tuple[float, float, float, float, float]:
+        """Poids propres à l'IA : ses défausses suivent le même modèle que ses constructions"""
+        return self.weights
+    
+    def _choose_discards(self, nb_cards: int, keep: Optional[str] = None) -> List[str]:
+        """Cartes de la main qui coûtent le moins à perdre (en gardant un exemplaire d'une carte donnée)"""
+        hand = list(self.deck)
+        return [hand[i] for i in self.suggest_discards(hand, nb_cards, keep)]
+    
+    # --- Fournisseur de décisions (gameio.DecisionProvider) pour son propre siège ---
+    
+    def choose_action(self, player: Player, game_state: dict) -> str:
+        return self.make_decision(game_state)
+    
+    def choose_card(self, player: Player, buildable: List[Tuple[str, int]]) -> str:
+        return self.choose_card_to_build({}) or ""
+    
+    def choose_indices(self, player: Player, cards: List[str], nb_cards: int, prompt: str) -> List[int]:
+        return self.suggest_discards(cards, nb_cards)
+    
+    def ask(self, prompt: str) -> str:
+        return ""
+    
+    def ai_build(self, carte: str) -> bool:
+        """Construit une carte en payant avec les cartes les moins utiles"""
+        cost = dict(self.get_buildable_cards()).get(carte)
+        if cost is None:
+            return False
+        
+        return self.build(carte, self._choose_discards(cost, keep=carte))
+    
+    def ai_check_carte(self):
+        """Défausse automatiquement les cartes en trop"""
+        max_cards = self.rules.max_cards
+        
+        if len(self.deck) > max_cards:
+            self.discard(self._choose_discards(len(self.deck) - max_cards))
+    
+    def ai_handle_pioche_action(self):
+        """Pioche (5 cartes par défaut), garde les meilleures et défausse les autres"""
+        rules = self.rules
+        
+        drawn = self.piocher(rules.cards_to_draw)
+        if not drawn:
+            return
+        
+        # Choix dans le contexte de la main complétée
+        nb_keep = max(rules.cards_to_draw - rules.cards_to_discard, 1)
+        self.discard([drawn[i] for i in self.suggest_discards(drawn, len(drawn) - nb_keep)])
+
+
+# Raisons de fin de partie (codes partagés par le moteur par lots et le journal des parties)
+END_NONE = 0
+END_BUILDINGS = 1
+END_EMPTY_PILE = 2
+END_TURN_LIMIT = 3
+END_REASONS = {END_NONE: "none", END_BUILDINGS: "buildings",
+               END_EMPTY_PILE: "empty_pile", END_TURN_LIMIT: "turn_limit"}
+
+
+class GameSnapshot(NamedTuple):
+    """État complet d'une partie, à plat et sérialisable (pickle)"""
+    turn_counter: int
+    current_player_index: int
+    pioche: tuple
+    players: Tuple[tuple, ...]
+    # (nom, personnalité ou None pour un humain, difficulté, poids ou None) : pour recréer la partie ailleurs
+    roster: Tuple[Tuple[str, Optional[str], float, Optional[tuple]], ...]
+
+
 class Game:
     """Gère le déroulement du jeu"""
     
-    def __init__(self):
+    __slots__ = ("catalog", "rules", "events", "decisions", "players", "current_player_index",
+                 "turn_counter", "seed", "recorder", "pioche")
+    
+    def __init__(self, catalog: Optional[CardCatalog] = None, seed: Optional[int] = None,
+                 events: Optional[EventSink] = None, decisions: Optional[DecisionProvider] = None,
+                 rules: Optional[Rules] = None):
+        self.catalog: CardCatalog = catalog if catalog is not None else CardCatalog.default()
+        self.rules: Rules = rules if rules is not None else DEFAULT_RULES
+        self.events: EventSink = events if events is not None else CONSOLE
+        self.decisions: DecisionProvider = decisions if decisions is not None else CONSOLE_DECISIONS  # Configuration
         self.players: List[Player] = []
         self.current_player_index: int = 0
-        self.pioche = Pioche()
+        self.turn_counter: int = 0
+        self.seed: Optional[int] = seed
+        self.recorder = None  # replay.ReplayRecorder quand la partie est enregistrée
+        self.pioche = Pioche(self.catalog, seed)
+    
+    def reset(self, seed: Optional[int] = None):
+        """Réinitialise la partie sur place, mêmes joueurs : équivaut à une partie neuve de cette graine"""
+        self.seed = seed
+        self.turn_counter = 0
+        self.current_player_index = 0
+        self.set_recorder(None)
+        self.pioche.reset(seed)
+        for player in self.players:
+            player.reset()
+            player.set_pioche(self.pioche)  # Mêmes générateurs dérivés que add_player
     
     def add_player(self, player: Player):
         """Ajoute un joueur au jeu"""
         player.set_pioche(self.pioche)  # Injection de dépendance
+        player.events = self.events
+        player.recorder = self.recorder
+        player.rules = self.rules
         self.players.append(player)
     
+    def set_recorder(self, recorder):
+        """Enregistre (ou plus, avec None) les actions de la partie et de ses joueurs"""
+        self.recorder = recorder
+        for player in self.players:
+            player.recorder = recorder
+    
+    def add_ai_player(self, name: str, personality: AIPersonality,
+                      difficulty: float = 1.0, weights: Optional[Tuple[float, ...]] = None) -> AIPlayer:
+        """Crée et ajoute un joueur IA (weights : poids d'un profil réglé au lieu de ceux de la personnalité)"""
+        if personality is AIPersonality.MCTS:
+            from mcts import MCTSPlayer  # Import tardif : mcts dépend de ce module
+            ai_player = MCTSPlayer(name, self, difficulty, self.catalog)
+        else:
+            ai_player = AIPlayer(name, personality, difficulty, self.catalog, weights)
+        self.add_player(ai_player)
+        return ai_player
+    
+    def create_game_state(self) -> dict:
+        """Résumé de l'état public du jeu, utilisé par les IA"""
+        return {
+            "turn": self.turn_counter,
+            "cards_remaining": self.pioche.cards_remaining(),
+            "current_player": self.current_player_index,
+            "players": [
+                {
+                    "name": p.name,
+                    "is_ai": p.is_ai,
+                    "hand_size": len(p.deck),
+                    "city_size": len(p.city),
+                    "points": p.point,
+                }
+                for p in self.players
+            ],
+        }
+    
+    def snapshot(self) -> GameSnapshot:
+        """Capture l'état de la partie (pioche, mains, villes, tour, générateur aléatoire)"""
+        return GameSnapshot(
+            self.turn_counter,
+            self.current_player_index,
+            self.pioche.snapshot(),
+            tuple(player.snapshot() for player in self.players),
+            tuple(
+                (player.name, player.personality.value, player.difficulty, player.weights)
+                if isinstance(player, AIPlayer) else (player.name, None, 1.0, None)
+                for player in self.players
+            ),
+        )
+    
+    def restore(self, snapshot: GameSnapshot):
+        """Remet la partie dans un état capturé par snapshot() (mêmes joueurs)"""
+        if len(snapshot.players) != len(self.players):
+            raise ValueError("Le snapshot ne correspond pas aux joueurs de la partie")
+        self.turn_counter = snapshot.turn_counter
+        self.current_player_index = snapshot.current_player_index
+        self.pioche.restore(snapshot.pioche)
+        for player, state in zip(self.players, snapshot.players):
+            player.restore(state)
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: GameSnapshot, catalog: Optional[CardCatalog] = None,
+                      rules: Optional[Rules] = None) -> "Game":
+        """Recrée une partie indépendante à partir d'un snapshot (ex. dans un autre processus)"""
+        game = cls(catalog, rules=rules)
+        for name, personality, difficulty, weights in snapshot.roster:
+            if personality is None:
+                game.add_player(Player(name, game.catalog))
+            else:
+                game.add_ai_player(name, AIPersonality(personality), difficulty, weights)
+        game.restore(snapshot)
+        return game
+    
     def next_turn(self):
         """Passe au joueur suivant"""
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
+        if self.recorder is not None:
+            self.recorder.next_turn()
     
     def current_player(self) -> Player:
         """Retourne le joueur actuel"""
@@ -274,26 +768,30 @@ class Game:
     
     def _handle_pioche_action(self, player: Player):
         """Gère l'action de pioche"""
-        CARDS_TO_DRAW = 5
-        CARDS_TO_DISCARD = 4
+        nb_to_discard = self.rules.cards_to_discard
         
-        initial_deck_size = len(player.deck)
-        player.piocher(CARDS_TO_DRAW)
+        last_cards = player.piocher(self.rules.cards_to_draw)
+        # Pioche presque vide : on garde au moins une carte
+        nb_to_discard = min(nb_to_discard, max(len(last_cards) - 1, 0))
+        if not nb_to_discard:
+            return
         
-        # Défausser 4 cartes parmi les 5 piochées
+        # Défausser 4 cartes parmi les 5 piochées (règles par défaut)
         while True:
-            print("Tu dois défausser 4 cartes parmi celles-ci :")
-            last_cards = player.deck[-CARDS_TO_DRAW:]
+            self.events.info("Tu dois défausser {} cartes parmi celles-ci :", nb_to_discard)
             
             for i, c in enumerate(last_cards):
-                print(f"{i}: {c}")
+                self.events.info("{}: {}", i, c)
+            if self.events.enabled(Verbosity.INFO):
+                suggested = sorted(player.suggest_discards(last_cards, nb_to_discard))
+                self.events.info("💡 Conseil : {}", " ".join(str(i) for i in suggested))
             
             try:
-                choix = input("Entre les numéros des cartes à défausser : ").split()
-                indices = [int(x) for x in choix]
+                indices = player.decisions.choose_indices(player, last_cards, nb_to_discard,
+                                                          "Entre les numéros des cartes à défausser : ")
                 
-                if len(indices) != CARDS_TO_DISCARD:
-                    print(f"Tu dois défausser exactement {CARDS_TO_DISCARD} cartes.")
+                if len(indices) != nb_to_discard:
+                    self.events.warning("Tu dois défausser exactement {} cartes.", nb_to_discard)
                     continue
                 
                 # Défausser les cartes sélectionnées
@@ -302,19 +800,17 @@ class Game:
                     if 0 <= i < len(last_cards):
                         cards_to_remove.append(last_cards[i])
                 
-                for card in cards_to_remove:
-                    player.deck.remove(card)
-                    self.pioche.defausse.append(card)
+                player.discard(cards_to_remove)
                 
                 break
                 
             except ValueError:
-                print("Entrée invalide.")
+                self.events.warning("Entrée invalide.")
     
     def _handle_human_build_action(self, player: Player):
         """Gère l'action de construction pour un humain"""
         while True:
-            carte = input("Quelle carte voulez-vous construire ? ").strip()
+            carte = player.decisions.choose_card(player, player.get_buildable_cards())
             if not carte:
                 continue
                 
@@ -324,68 +820,79 @@ class Game:
     
     def _handle_ai_turn(self, ai_player: AIPlayer):
         """Gère le tour complet d'un joueur IA"""
-        game_state = self.create_game_state()
-        
-        print(f"\n{ai_player.name} (IA {ai_player.personality.value}) réfléchit...")
-        
-        # Pioche automatique basée sur l'argent
-        money = ai_player.calc_money()
-        if money > 0:
-            ai_player.piocher(money)
-            print(f"{ai_player.name} pioche {money} carte(s) grâce à son argent.")
-        
-        # Décision de l'IA
-        decision = ai_player.make_decision(game_state)
-        print(f"{ai_player.name} décide de : {decision}")
-        
-        if decision == "piocher":
-            ai_player.ai_handle_pioche_action()
-            print(f"{ai_player.name} pioche 5 cartes et en défausse 4.")
-        
-        elif decision == "construire":
-            card_to_build = ai_player.choose_card_to_build(game_state)
-            if card_to_build:
-                if ai_player.ai_build(card_to_build):
-                    print(f"{ai_player.name} construit : {card_to_build}")
-                    ai_player.ai_check_carte()
+        profiler = profiling.PROFILER
+        with profiler.phase("ai_turn"):
+            game_state = self.create_game_state()
+            
+            self.events.info("\n{} (IA {}) réfléchit...", ai_player.name, ai_player.personality.value)
+            
+            # Pioche automatique basée sur l'argent
+            with profiler.phase("money_draw"):
+                money = ai_player.calc_money()
+                if money > 0:
+                    ai_player.piocher(money)
+                    self.events.info("{} pioche {} carte(s) grâce à son argent.", ai_player.name, money)
+            
+            # Décision de l'IA
+            with profiler.phase("decision"):
+                decision = ai_player.make_decision(game_state)
+            self.events.info("{} décide de : {}", ai_player.name, decision)
+            
+            if decision == "piocher":
+                with profiler.phase("draw_action"):
+                    ai_player.ai_handle_pioche_action()
+                self.events.info("{} pioche {} cartes et en défausse {}.", ai_player.name,
+                                 self.rules.cards_to_draw, self.rules.cards_to_discard)
+            
+            elif decision == "construire":
+                with profiler.phase("build_action"):
+                    card_to_build = ai_player.choose_card_to_build(game_state)
+                    built = bool(card_to_build) and ai_player.ai_build(card_to_build)
+                    if built:
+                        ai_player.ai_check_carte()
+                if built:
+                    self.events.info("{} construit : {}", ai_player.name, card_to_build)
+                elif card_to_build:
+                    self.events.warning("{} n'arrive pas à construire {}", ai_player.name, card_to_build)
                 else:
-                    print(f"{ai_player.name} n'arrive pas à construire {card_to_build}")
-            else:
-                print(f"{ai_player.name} n'a aucune carte constructible")
-        
-        # Calcul et affichage du score
-        ai_player.calc_score()
-        print(f"État de {ai_player.name} : {ai_player}")
+                    self.events.info("{} n'a aucune carte constructible", ai_player.name)
+            
+            # Calcul et affichage du score
+            with profiler.phase("scoring"):
+                ai_player.calc_score()
+            with profiler.phase("display"):
+                self.events.debug("État de {} : {}", ai_player.name, ai_player)
     
     def _setup_players(self):
         """Configure les joueurs du jeu"""
-        print("=== Configuration des joueurs ===")
+        ask, events = self.decisions.ask, self.events
+        events.info("=== Configuration des joueurs ===")
         
         try:
-            nb_players = int(input("Combien de joueurs au total ? "))
+            nb_players = int(ask("Combien de joueurs au total ? "))
             if nb_players <= 0 or nb_players > 6:
-                print("Nombre de joueurs invalide (1-6).")
+                events.warning("Nombre de joueurs invalide (1-6).")
                 return False
         except ValueError:
-            print("Nombre de joueurs invalide.")
+            events.warning("Nombre de joueurs invalide.")
             return False
         
         for i in range(nb_players):
-            print(f"\n--- Joueur {i + 1} ---")
-            is_ai = input("Joueur IA ? (o/n) : ").lower().startswith('o')
+            events.info("\n--- Joueur {} ---", i + 1)
+            is_ai = ask("Joueur IA ? (o/n) : ").lower().startswith('o')
             
             if is_ai:
                 # Configuration IA
-                name = input(f"Nom de l'IA {i + 1} : ").strip()
+                name = ask(f"Nom de l'IA {i + 1} : ").strip()
                 if not name:
                     name = f"IA-{i + 1}"
                 
-                print("Personnalités disponibles :")
+                events.info("Personnalités disponibles :")
                 for j, personality in enumerate(AIPersonality, 1):
-                    print(f"{j}. {personality.value}")
+                    events.info("{}. {}", j, personality.value)
                 
                 try:
-                    choice = int(input("Choisissez une personnalité (1-5) : ")) - 1
+                    choice = int(ask(f"Choisissez une personnalité (1-{len(AIPersonality)}) : ")) - 1
                     personalities = list(AIPersonality)
                     if 0 <= choice < len(personalities):
                         personality = personalities[choice]
@@ -395,53 +902,62 @@ class Game:
                     personality = AIPersonality.BALANCED
                 
                 try:
-                    difficulty = float(input("Difficulté (0.0=facile, 1.0=expert) : "))
+                    difficulty = float(ask("Difficulté (0.0=facile, 1.0=expert) : "))
                     difficulty = max(0.0, min(1.0, difficulty))
                 except ValueError:
                     difficulty = 1.0
                 
                 ai_player = self.add_ai_player(name, personality, difficulty)
-                print(f"IA {name} ajoutée (personnalité: {personality.value}, difficulté: {difficulty})")
+                events.info("IA {} ajoutée (personnalité: {}, difficulté: {})", name, personality.value, difficulty)
             
             else:
-                # Joueur humain
-                name = input(f"Nom du joueur {i + 1} : ").strip()
+                # Joueur humain : ses choix viennent de la même source que la configuration
+                name = ask(f"Nom du joueur {i + 1} : ").strip()
                 if not name:
                     name = f"Joueur-{i + 1}"
                 
-                player = Player(name)
+                player = Player(name, self.catalog, self.decisions)
                 self.add_player(player)
-                print(f"Joueur humain {name} ajouté")
+                events.info("Joueur humain {} ajouté", name)
         
         return True
     
+    def end_reason(self, max_turns: Optional[int] = None) -> int:
+        """Code de la condition de fin remplie (END_NONE si la partie continue)"""
+        rules = self.rules
+        if any(len(player.city) >= rules.buildings_to_end for player in self.players):
+            return END_BUILDINGS
+        if self.pioche.cards_remaining() == 0:
+            return END_EMPTY_PILE
+        if self.turn_counter >= min(max_turns or rules.turn_limit, rules.turn_limit):
+            return END_TURN_LIMIT
+        return END_NONE
+    
     def _check_end_conditions(self) -> bool:
         """Vérifie les conditions de fin de partie"""
-        # Exemple de conditions de fin (à adapter selon vos règles)
+        rules = self.rules
         
-        # Fin si un joueur a construit 8 cartes
+        # Fin si un joueur a construit 8 cartes (règles par défaut)
         for player in self.players:
-            if len(player.city) >= 8:
-                print(f"\n{player.name} a construit 8 cartes ! Fin de partie.")
+            if len(player.city) >= rules.buildings_to_end:
+                self.events.result("\n{} a construit {} cartes ! Fin de partie.", player.name, len(player.city))
                 return True
         
         # Fin si plus de cartes disponibles
         if self.pioche.cards_remaining() == 0:
-            print("\nPlus de cartes disponibles ! Fin de partie.")
+            self.events.result("\nPlus de cartes disponibles ! Fin de partie.")
             return True
         
         # Fin après 50 tours (sécurité)
-        if self.turn_counter >= 50:
-            print("\nLimite de tours atteinte ! Fin de partie.")
+        if self.turn_counter >= rules.turn_limit:
+            self.events.result("\nLimite de tours atteinte ! Fin de partie.")
             return True
         
         return False
     
     def _display_final_scores(self):
         """Affiche les scores finaux et détermine le gagnant"""
-        print("\n" + "="*60)
-        print("🏆 SCORES FINAUX 🏆")
-        print("="*60)
+        events = self.events
         
         # Calculer les scores finaux
         for player in self.players:
@@ -450,209 +966,401 @@ class Game:
         # Trier par score décroissant
         sorted_players = sorted(self.players, key=lambda p: p.point, reverse=True)
         
+        if not events.enabled(Verbosity.RESULT):
+            return
+        
+        events.result("\n" + "="*60)
+        events.result("🏆 SCORES FINAUX 🏆")
+        events.result("="*60)
+        
         for i, player in enumerate(sorted_players, 1):
             trophy = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "  "
             player_type = "(IA)" if player.is_ai else ""
-            print(f"{trophy} {i}. {player.name} {player_type}: {player.point} points")
-            print(f"   Cartes construites: {len(player.city)} | Argent: {player.calc_money()}")
-            print(f"   Ville: {', '.join(player.city)}")
-            print()
+            events.result(f"{trophy} {i}. {player.name} {player_type}: {player.point} points")
+            events.result(f"   Cartes construites: {len(player.city)} | Argent: {player.calc_money()}")
+            events.result(f"   Ville: {', '.join(player.city)}")
+            events.result("")
         
         winner = sorted_players[0]
-        print(f"🎉 Félicitations à {winner.name} qui remporte la partie ! 🎉")
+        events.result(f"🎉 Félicitations à {winner.name} qui remporte la partie ! 🎉")
     
     def _display_game_status(self):
         """Affiche l'état actuel du jeu"""
-        print(f"\n{'='*50}")
-        print(f"🎮 TOUR {self.turn_counter + 1} 🎮")
-        print(f"Cartes restantes dans la pioche: {self.pioche.cards_remaining()}")
-        print(f"{'='*50}")
+        events = self.events
+        if not events.enabled(Verbosity.INFO):
+            return
+        
+        events.info(f"\n{'='*50}")
+        events.info(f"🎮 TOUR {self.turn_counter + 1} 🎮")
+        events.info(f"Cartes restantes dans la pioche: {self.pioche.cards_remaining()}")
+        events.info(f"{'='*50}")
         
         # Afficher un résumé de tous les joueurs
         for player in self.players:
             player_type = "(IA)" if player.is_ai else ""
             marker = "👉" if player == self.current_player() else "  "
-            print(f"{marker} {player.name} {player_type}: {len(player.city)} cartes construites, {player.point} points")
-        print()
+            events.info(f"{marker} {player.name} {player_type}: {len(player.city)} cartes construites, {player.point} points")
+        events.info("")
     
     def run(self):
         """Lance le jeu principal"""
-        print("🏛️  Bienvenue dans le jeu de construction de ville ! 🏛️")
-        print()
+        with profiling.PROFILER.phase("run"):
+            self._run()
+    
+    def _run(self):
+        """Configuration, boucle de jeu et scores finaux"""
+        events = self.events
+        events.info("🏛️  Bienvenue dans le jeu de construction de ville ! 🏛️")
+        events.info("")
         
-        # Configuration des joueurs
-        if not self._setup_players():
+        # Configuration des joueurs (sauf s'ils ont été ajoutés avant run())
+        if not self.players and not self._setup_players():
             return
         
         if not self.players:
-            print("Aucun joueur configuré.")
+            events.warning("Aucun joueur configuré.")
             return
         
         # Distribution initiale
-        print("\n🎴 Distribution des cartes initiales...")
+        events.info("\n🎴 Distribution des cartes initiales...")
         for player in self.players:
-            player.piocher(5)
+            player.piocher(self.rules.initial_cards)
         
-        print("🎲 Le jeu commence !")
+        events.info("🎲 Le jeu commence !")
         
         # Boucle de jeu principale
         try:
             while not self._check_end_conditions():
                 current_player = self.current_player()
+                profiling.PROFILER.count("turns")
                 
-                self._display_game_status()
+                with profiling.PROFILER.phase("display"):
+                    self._display_game_status()
                 
                 if isinstance(current_player, AIPlayer):
                     # Tour de l'IA
                     self._handle_ai_turn(current_player)
                 else:
-                    # Tour du joueur humain
-                    print(f"C'est le tour de {current_player.name}")
-                    
-                    # Pioche automatique basée sur l'argent
-                    money = current_player.calc_money()
-                    if money > 0:
-                        current_player.piocher(money)
-                        print(f"Tu pioches {money} carte(s) grâce à ton argent.")
-                    
-                    print(f"Ton état actuel : {current_player}")
-                    
-                    # Choix de l'action
-                    while True:
-                        choice = input("Que veux-tu faire ? (piocher/construire/info) : ").strip().lower()
-                        
-                        if choice == "info":
-                            print("\n📊 Informations du jeu :")
-                            for p in self.players:
-                                p_type = "(IA)" if p.is_ai else ""
-                                print(f"- {p.name} {p_type}: {len(p.city)} cartes, {p.point} points")
-                            print()
-                            continue
-                        
-                        elif choice == "piocher":
-                            self._handle_human_pioche_action(current_player)
-                            break
-                        
-                        elif choice == "construire":
-                            buildable = current_player.get_buildable_cards()
-                            if not buildable:
-                                print("Tu n'as aucune carte constructible.")
-                                continue
-                            
-                            print("Cartes constructibles :")
-                            for card, cost in buildable:
-                                print(f"- {card} (coût: {cost})")
-                            
-                            self._handle_human_build_action(current_player)
-                            break
-                        
-                        else:
-                            print("Choix invalide. Tapez 'piocher', 'construire' ou 'info'.")
-                    
-                    # Calculer le score
-                    current_player.calc_score()
-                    print(f"Ton état final : {current_player}")
+                    # Tour du joueur humain (ou scripté)
+                    self._handle_human_turn(current_player)
                 
                 self.next_turn()
+                if self.current_player_index == 0:
+                    self.turn_counter += 1
                 
                 # Pause pour les parties avec IA (optionnel)
                 if any(isinstance(p, AIPlayer) for p in self.players) and not isinstance(current_player, AIPlayer):
-                    input("\nAppuyez sur Entrée pour continuer...")
+                    current_player.decisions.ask("\nAppuyez sur Entrée pour continuer...")
         
         except KeyboardInterrupt:
-            print("\n\n⏸️  Jeu interrompu par l'utilisateur.")
-            print("Calcul des scores actuels...")
+            events.warning("\n\n⏸️  Jeu interrompu par l'utilisateur.")
+            events.warning("Calcul des scores actuels...")
         
         # Affichage des scores finaux
-        self._display_final_scores()
+        with profiling.PROFILER.phase("final_scores"):
+            self._display_final_scores()
+    
+    def _handle_human_turn(self, player: Player):
+        """Gère le tour d'un joueur dont les choix viennent de son fournisseur de décisions"""
+        events = self.events
+        events.info("C'est le tour de {}", player.name)
+        
+        # Pioche automatique basée sur l'argent
+        money = player.calc_money()
+        if money > 0:
+            player.piocher(money)
+            events.info("Tu pioches {} carte(s) grâce à ton argent.", money)
+        
+        events.info("Ton état actuel : {}", player)
+        
+        # Choix de l'action
+        while True:
+            choice = player.decisions.choose_action(player, self.create_game_state())
+            
+            if choice == "info":
+                events.info("\n📊 Informations du jeu :")
+                for p in self.players:
+                    p_type = "(IA)" if p.is_ai else ""
+                    events.info("- {} {}: {} cartes, {} points", p.name, p_type, len(p.city), p.point)
+                events.info("")
+                continue
+            
+            elif choice == "piocher":
+                self._handle_pioche_action(player)
+                break
+            
+            elif choice == "construire":
+                buildable = player.get_buildable_cards()
+                if not buildable:
+                    events.warning("Tu n'as aucune carte constructible.")
+                    continue
+                
+                events.info("Cartes constructibles :")
+                for card, cost in buildable:
+                    events.info("- {} (coût: {})", card, cost)
+                
+                self._handle_human_build_action(player)
+                break
+            
+            else:
+                events.warning("Choix invalide. Tapez 'piocher', 'construire' ou 'info'.")
+        
+        # Calculer le score
+        player.calc_score()
+        events.info("Ton état final : {}", player)
+
+
+def _game_seeds(seed: Optional[int], nb_games: int) -> List[Optional[int]]:
+    """Graine reproductible de chaque partie à partir de la graine du tournoi"""
+    if seed is None:
+        return [None] * nb_games
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(nb_games)]
+
+
+class GamePool:
+    """Parties réutilisées par les boucles de simulation : une par composition de table, remise à zéro par reset()"""
+    
+    def __init__(self):
+        self._games: Dict[tuple, Game] = {}
+    
+    def acquire(self, personalities: List[AIPersonality], seed: Optional[int] = None,
+                rules: Optional[Rules] = None, weights: Optional[List[Optional[tuple]]] = None,
+                events: Optional[EventSink] = None) -> Game:
+        """Partie prête à jouer (joueurs ajoutés, aucune carte distribuée) ; valable jusqu'à l'appel suivant"""
+        key = (tuple(personalities), rules, tuple(weights) if weights is not None else None)
+        game = self._games.get(key)
+        if game is None:
+            game = Game(seed=seed, events=NULL_SINK, rules=rules)
+            for seat, personality in enumerate(personalities):
+                ai_name = f"IA-{personality.value.capitalize()}"
+                game.add_ai_player(ai_name, personality, difficulty=1.0,
+                                   weights=weights[seat] if weights is not None else None)
+            self._games[key] = game
+        else:
+            game.reset(seed)
+        
+        events = events if events is not None else NULL_SINK
+        if game.events is not events:
+            game.events = events
+            for player in game.players:
+                player.events = events
+        return game
+
+
+def _play_games_chunk(personalities: List[AIPersonality], seeds: List[Optional[int]],
+                      max_turns: Optional[int], profile: bool = False, record: bool = False,
+                      rules: Optional[Rules] = None):
+    """Joue un lot de parties en silence (exécuté dans un processus du pool)"""
+    profiler = profiling.reset() if profile else None
+    results = AITester.empty_results(personalities)
+    stats = AITester.empty_stats(personalities)
+    game_outcomes = []
+    pool = GamePool()
+    for game_seed in seeds:
+        game = AITester.play_ai_game(personalities, game_seed, max_turns, rules=rules, pool=pool)
+        AITester.record_game(results, game)
+        stats.record_game(game)
+        if record:
+            game_outcomes.append(GameOutcome.from_game(game, game_seed, max_turns or game.rules.battle_turns))
+    
+    report = None
+    if profiler is not None:
+        report = profiler.report()
+        profiling.disable()  # Le processus du pool peut être réutilisé
+    return results, report, game_outcomes, stats
 
 
 class AITester:
     """Classe pour tester et comparer les IA"""
     
     @staticmethod
-    def run_ai_battle(personalities: List[AIPersonality], nb_games: int = 10):
-        """Lance plusieurs parties entre IAs pour tester leurs performances"""
-        print(f"🤖 Bataille d'IA - {nb_games} parties")
-        print("="*50)
+    def empty_results(personalities: List[AIPersonality]) -> Dict[AIPersonality, Dict[str, int]]:
+        """Tableau de résultats vide (victoires, points, parties par personnalité)"""
+        return {personality: {"wins": 0, "points": 0, "games": 0} for personality in personalities}
+    
+    @staticmethod
+    def empty_stats(personalities: List[AIPersonality]) -> BattleStats:
+        """Statistiques en flux vides, un siège par personnalité"""
+        return BattleStats([personality.value for personality in personalities])
+    
+    @staticmethod
+    def play_ai_turn(game: Game, current: AIPlayer):
+        """Joue le tour d'une IA sans affichage (version accélérée de Game._handle_ai_turn)"""
+        profiler = profiling.PROFILER
+        game_state = game.create_game_state()
         
-        results = {personality: {"wins": 0, "points": 0, "games": 0} for personality in personalities}
+        # Pioche basée sur l'argent
+        with profiler.phase("money_draw"):
+            money = current.calc_money()
+            if money > 0:
+                current.piocher(money)
         
-        for game_num in range(nb_games):
-            print(f"\nPartie {game_num + 1}/{nb_games}")
-            
-            game = Game()
-            
-            # Ajouter les IA
-            for i, personality in enumerate(personalities):
-                ai_name = f"IA-{personality.value.capitalize()}"
-                game.add_ai_player(ai_name, personality, difficulty=1.0)
-            
-            # Distribution initiale
-            for player in game.players:
-                player.piocher(5)
+        # Décision IA
+        with profiler.phase("decision"):
+            decision = current.make_decision(game_state)
+        
+        if decision == "piocher":
+            with profiler.phase("draw_action"):
+                current.ai_handle_pioche_action()
+        elif decision == "construire":
+            with profiler.phase("build_action"):
+                card_to_build = current.choose_card_to_build(game_state)
+                if card_to_build:
+                    current.ai_build(card_to_build)
+                    current.ai_check_carte()
+    
+    @staticmethod
+    def play_ai_game(personalities: List[AIPersonality], seed: Optional[int] = None,
+                     max_turns: Optional[int] = None, events: Optional[EventSink] = None,
+                     recorder=None, weights: Optional[List[Optional[tuple]]] = None,
+                     rules: Optional[Rules] = None, pool: Optional[GamePool] = None) -> Game:
+        """Joue une partie complète entre IAs et retourne le jeu terminé (muette par défaut ; pool : partie réutilisée)"""
+        profiler = profiling.PROFILER
+        with profiler.phase("game"):
+            with profiler.phase("setup"):
+                if pool is not None:
+                    game = pool.acquire(personalities, seed, rules, weights, events)
+                else:
+                    game = Game(seed=seed, events=events if events is not None else NULL_SINK, rules=rules)
+                    
+                    # Ajouter les IA (weights : poids par siège, None pour ceux de la personnalité)
+                    for seat, personality in enumerate(personalities):
+                        ai_name = f"IA-{personality.value.capitalize()}"
+                        game.add_ai_player(ai_name, personality, difficulty=1.0,
+                                           weights=weights[seat] if weights is not None else None)
+                if max_turns is None:
+                    max_turns = game.rules.battle_turns
+                if recorder is not None:
+                    recorder.attach(game)  # replay.ReplayRecorder
+                
+                # Distribution initiale
+                for player in game.players:
+                    player.piocher(game.rules.initial_cards)
             
             # Simuler la partie (version accélérée)
-            max_turns = 30
-            turn = 0
-            
-            while turn < max_turns and not game._check_end_conditions():
+            while game.turn_counter < max_turns and not game._check_end_conditions():
                 current = game.current_player()
+                profiler.count("turns")
                 
                 if isinstance(current, AIPlayer):
-                    game_state = game.create_game_state()
-                    
-                    # Pioche basée sur l'argent
-                    money = current.calc_money()
-                    if money > 0:
-                        current.piocher(money)
-                    
-                    # Décision IA
-                    decision = current.make_decision(game_state)
-                    
-                    if decision == "piocher":
-                        current.ai_handle_pioche_action()
-                    elif decision == "construire":
-                        card_to_build = current.choose_card_to_build(game_state)
-                        if card_to_build:
-                            current.ai_build(card_to_build)
-                            current.ai_check_carte()
+                    AITester.play_ai_turn(game, current)
                 
                 game.next_turn()
                 if game.current_player_index == 0:
-                    turn += 1
+                    game.turn_counter += 1
             
             # Calculer les scores
-            for player in game.players:
-                player.calc_score()
-            
-            # Enregistrer les résultats
-            sorted_players = sorted(game.players, key=lambda p: p.point, reverse=True)
-            winner = sorted_players[0]
-            
-            # Trouver la personnalité du gagnant
-            if isinstance(winner, AIPlayer):
-                results[winner.personality]["wins"] += 1
-            
-            # Enregistrer les points de tous
-            for player in game.players:
-                if isinstance(player, AIPlayer):
-                    results[player.personality]["points"] += player.point
-                    results[player.personality]["games"] += 1
+            with profiler.phase("scoring"):
+                for player in game.players:
+                    player.calc_score()
         
-        # Afficher les statistiques
-        print(f"\n📊 Résultats après {nb_games} parties :")
-        print("="*60)
+        profiler.count("games")
+        return game
+    
+    @staticmethod
+    def record_game(results: Dict[AIPersonality, Dict[str, int]], game: Game):
+        """Ajoute le résultat d'une partie terminée au tableau de résultats"""
+        sorted_players = sorted(game.players, key=lambda p: p.point, reverse=True)
+        winner = sorted_players[0]
         
-        sorted_results = sorted(results.items(), key=lambda x: x[1]["wins"], reverse=True)
+        # Trouver la personnalité du gagnant
+        if isinstance(winner, AIPlayer):
+            results[winner.personality]["wins"] += 1
         
-        for personality, stats in sorted_results:
-            avg_points = stats["points"] / max(stats["games"], 1)
-            win_rate = (stats["wins"] / nb_games) * 100
-            
-            print(f"{personality.value.capitalize():12} | "
-                  f"Victoires: {stats['wins']:2d} ({win_rate:5.1f}%) | "
-                  f"Points moy: {avg_points:5.1f}")
+        # Enregistrer les points de tous
+        for player in game.players:
+            if isinstance(player, AIPlayer):
+                results[player.personality]["points"] += player.point
+                results[player.personality]["games"] += 1
+    
+    @staticmethod
+    def merge_results(results: Dict[AIPersonality, Dict[str, int]],
+                      partial: Dict[AIPersonality, Dict[str, int]]):
+        """Fusionne un tableau partiel dans le tableau global"""
+        for personality, stats in partial.items():
+            for key, value in stats.items():
+                results[personality][key] += value
+    
+    @staticmethod
+    def run_ai_battle(personalities: List[AIPersonality], nb_games: int = 10,
+                      seed: Optional[int] = None, outcomes: Optional[str] = None,
+                      confidence: Optional[float] = None, min_games: int = 20,
+                      check_every: int = 10, rules: Optional[Rules] = None):
+        """Lance plusieurs parties entre IAs (outcomes : journal SQLite ; confidence : arrêt anticipé, nb_games devient un maximum)"""
+        if confidence is None:
+            print(f"🤖 Bataille d'IA - {nb_games} parties")
+        else:
+            print(f"🤖 Bataille d'IA - jusqu'à {nb_games} parties (arrêt à {confidence:.0%} de confiance)")
+        print("="*50)
+        
+        results = AITester.empty_results(personalities)
+        stats = AITester.empty_stats(personalities)
+        writer = OutcomeWriter(outcomes) if outcomes else None
+        
+        # Le classement est testé à chaque point de contrôle : le risque est réparti entre eux
+        # (Bonferroni) pour que les regards répétés ne gonflent pas le risque global
+        if confidence is not None:
+            looks = max(math.ceil((nb_games - min_games) / check_every), 0) + 1
+            alpha = (1 - confidence) / looks
+        
+        pool = GamePool()
+        try:
+            with profiling.PROFILER.phase("battle"):
+                for game_num, game_seed in enumerate(_game_seeds(seed, nb_games), 1):
+                    print(f"\nPartie {game_num}/{nb_games}")
+                    game = AITester.play_ai_game(personalities, game_seed, rules=rules, pool=pool)
+                    AITester.record_game(results, game)
+                    stats.record_game(game)
+                    if writer is not None:
+                        writer.record_game(game, game_seed, max_turns=game.rules.battle_turns)
+                    if (confidence is not None and game_num >= min_games
+                            and (game_num - min_games) % check_every == 0 and stats.is_settled(alpha)):
+                        print(f"\n✅ Classement établi après {game_num} parties")
+                        break
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        stats.display(confidence if confidence is not None else 0.95)
+        return results
+    
+    @staticmethod
+    def run_tournament(personalities: List[AIPersonality], nb_games: int = 1000,
+                       seed: int = 0, workers: Optional[int] = None,
+                       max_turns: Optional[int] = None, outcomes: Optional[str] = None,
+                       rules: Optional[Rules] = None) -> Dict[AIPersonality, Dict[str, int]]:
+        """Répartit les parties sur un pool de processus, une graine par partie (outcomes : journal SQLite)"""
+        workers = workers or os.cpu_count() or 1
+        seeds = _game_seeds(seed, nb_games)
+        
+        # Quelques lots par processus : peu d'échanges, charge équilibrée
+        nb_chunks = min(nb_games, workers * 4) or 1
+        chunks = [seeds[i::nb_chunks] for i in range(nb_chunks)]
+        
+        profiler = profiling.PROFILER
+        results = AITester.empty_results(personalities)
+        stats = AITester.empty_stats(personalities)
+        writer = OutcomeWriter(outcomes) if outcomes else None
+        try:
+            with profiler.phase("tournament"), ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_play_games_chunk, personalities, chunk, max_turns,
+                                       profiler.enabled, writer is not None, rules)
+                           for chunk in chunks]
+                for future in futures:
+                    partial, report, game_outcomes, partial_stats = future.result()
+                    AITester.merge_results(results, partial)
+                    stats.merge(partial_stats)
+                    if report is not None:
+                        profiler.merge(report, prefix="workers")
+                    for outcome in game_outcomes:
+                        writer.record(outcome)
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        stats.display()
+        return results
 
 
 def main():
@@ -692,7 +1400,12 @@ def main():
                 
                 if len(personalities) >= 2:
                     nb_games = int(input("Nombre de parties (défaut: 10) : ") or "10")
-                    AITester.run_ai_battle(personalities, nb_games)
+                    if nb_games > 100:
+                        AITester.run_tournament(personalities, nb_games)
+                    else:
+                        answer = input("Arrêt dès que le classement est sûr ? Confiance (ex: 0.95, vide = non) : ").strip()
+                        confidence = float(answer) if answer else None
+                        AITester.run_ai_battle(personalities, nb_games, confidence=confidence)
                 else:
                     print("Il faut au moins 2 personnalités différentes.")
             
@@ -707,6 +1420,7 @@ def main():
             print("⚖️  BALANCED : Stratégie équilibrée entre tous les aspects")
             print("🛡️  DEFENSIVE : Joue prudemment, évite les risques")
             print("🎯 OPPORTUNISTIC : S'adapte aux situations, saisit les opportunités")
+            print("🌳 MCTS : Simule des parties aléatoires pour choisir chaque coup (plus lent)")
             print("\n💡 Conseils :")
             print("- Difficulté 0.0 = IA imprévisible, fait parfois des erreurs")
             print("- Difficulté 1.0 = IA experte, joue optimalement")
@@ -724,91 +1438,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-                    self.pioche.defausse.append(card)
-                
-                break
-                
-            except ValueError:
-                print("Entrée invalide.")
-    
-    def _handle_build_action(self, player: Player):
-        """Gère l'action de construction"""
-        while True:
-            carte = input("Quelle carte voulez-vous construire ? ").strip()
-            if not carte:
-                continue
-                
-            if player.build(carte):
-                player.check_carte()
-                break
-    
-    def run(self):
-        """Lance le jeu"""
-        # Initialisation des joueurs
-        try:
-            nb_players = int(input("Combien de joueurs ? "))
-            if nb_players <= 0:
-                print("Le nombre de joueurs doit être positif.")
-                return
-        except ValueError:
-            print("Nombre de joueurs invalide.")
-            return
-        
-        for i in range(nb_players):
-            name = input(f"Nom du joueur {i + 1} : ").strip()
-            if not name:
-                name = f"Joueur {i + 1}"
-            
-            player = Player(name)
-            self.add_player(player)
-            player.piocher(5)  # Distribution initiale
-        
-        # Boucle de jeu
-        turn_counter = 0
-        MAX_TURNS = 1000  # Sécurité contre les boucles infinies
-        
-        while turn_counter < MAX_TURNS:
-            current_player = self.current_player()
-            print(f"\n{'='*50}")
-            print(f"Tour {turn_counter + 1} - C'est le tour de {current_player.name}")
-            print(f"{'='*50}")
-            
-            # Pioche automatique basée sur l'argent
-            money = current_player.calc_money()
-            if money > 0:
-                current_player.piocher(money)
-                print(f"{current_player.name} pioche {money} carte(s) grâce à son argent.")
-            
-            print(current_player)
-            
-            # Choix de l'action
-            while True:
-                choice = input("Que voulez-vous faire ? (piocher/construire) : ").strip().lower()
-                
-                if choice == "piocher":
-                    self._handle_pioche_action(current_player)
-                    break
-                elif choice == "construire":
-                    self._handle_build_action(current_player)
-                    break
-                else:
-                    print("Choix invalide. Tapez 'piocher' ou 'construire'.")
-            
-            current_player.calc_score()
-            print(f"État final : {current_player}")
-            
-            self.next_turn()
-            turn_counter += 1
-        
-        if turn_counter >= MAX_TURNS:
-            print("Limite de tours atteinte. Fin du jeu.")
-
-
-if __name__ == "__main__":
-    try:
-        game = Game()
-        game.run()
-    except KeyboardInterrupt:
-        print("\nJeu interrompu par l'utilisateur.")
-    except Exception as e:
-        print(f"Erreur inattendue : {e}")
@@ -0,0 +1,189 @@
+import math
+from statistics import NormalDist
+from typing import Dict, List, Sequence, Tuple
+
+
+_NORMAL = NormalDist()
+
+
+def z_score(confidence: float) -> float:
+    """Quantile de la loi normale pour un intervalle bilatéral de niveau `confidence`"""
+    return _NORMAL.inv_cdf(0.5 + confidence / 2)
+
+
+def two_sided_p(z: float) -> float:
+    """p-valeur bilatérale d'une statistique normale centrée réduite"""
+    if math.isinf(z):
+        return 0.0
+    return 2.0 * (1.0 - _NORMAL.cdf(abs(z)))
+
+
+def sign_test_p(successes: int, n: int) -> float:
+    """p-valeur bilatérale exacte du test du signe : successes sur n sous une binomiale de paramètre 1/2"""
+    if not n:
+        return 1.0
+    k = min(successes, n - successes)
+    # Queue P(X <= k), terme à terme depuis P(X = k) : les termes décroissent, pas de grands entiers
+    term = math.exp(math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1) - n * math.log(2))
+    tail = 0.0
+    for x in range(k, -1, -1):
+        tail += term
+        if term < tail * 1e-17:
+            break
+        term *= x / (n - x + 1)
+    return min(1.0, 2.0 * tail)
+
+
+def wilson_interval(successes: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Intervalle de Wilson d'une proportion (reste dans [0, 1] même pour 0 ou n succès)"""
+    if n == 0:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class RunningStats:
+    """Moyenne et variance en flux (Welford), fusionnables entre processus"""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    def merge(self, other: "RunningStats"):
+        """Ajoute les observations d'un autre accumulateur (formule de Chan)"""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def stderr(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count else 0.0
+
+    def interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        half = z_score(confidence) * self.stderr
+        return self.mean - half, self.mean + half
+
+
+class BattleStats:
+    """Statistiques en flux d'une série de parties entre les mêmes sièges"""
+
+    def __init__(self, labels: Sequence[str]):
+        self.labels = list(labels)
+        nb_seats = len(self.labels)
+        self.games = 0
+        self.wins = [0] * nb_seats
+        self.totals = [0] * nb_seats
+        self.points = [RunningStats() for _ in range(nb_seats)]
+        # Écart de points partie par partie entre deux sièges (test apparié)
+        self.diffs: Dict[Tuple[int, int], RunningStats] = {
+            (i, j): RunningStats() for i in range(nb_seats) for j in range(i + 1, nb_seats)
+        }
+
+    def record(self, scores: Sequence[int], winner: int):
+        self.games += 1
+        self.wins[winner] += 1
+        for seat, score in enumerate(scores):
+            self.totals[seat] += score
+            self.points[seat].add(score)
+        for (i, j), diff in self.diffs.items():
+            diff.add(scores[i] - scores[j])
+
+    def record_game(self, game):
+        """Ajoute une partie terminée (même départage que AITester.record_game)"""
+        scores = [player.point for player in game.players]
+        self.record(scores, scores.index(max(scores)))
+
+    def merge(self, other: "BattleStats"):
+        self.games += other.games
+        for seat in range(len(self.labels)):
+            self.wins[seat] += other.wins[seat]
+            self.totals[seat] += other.totals[seat]
+            self.points[seat].merge(other.points[seat])
+        for pair, diff in self.diffs.items():
+            diff.merge(other.diffs[pair])
+
+    def win_rate(self, seat: int) -> float:
+        return self.wins[seat] / self.games if self.games else 0.0
+
+    def win_interval(self, seat: int, confidence: float = 0.95) -> Tuple[float, float]:
+        return wilson_interval(self.wins[seat], self.games, confidence)
+
+    def compare_wins(self, i: int, j: int) -> Tuple[float, float]:
+        """(z, p) : i gagne-t-il plus souvent que j ? Test du signe exact sur les parties gagnées par l'un d'eux"""
+        decided = self.wins[i] + self.wins[j]
+        if not decided:
+            return 0.0, 1.0
+        # z ne donne que le sens et l'ampleur de l'écart : aux petits effectifs des premiers points de
+        # contrôle, l'approximation normale rejetterait trop facilement
+        z = (self.wins[i] - self.wins[j]) / math.sqrt(decided)
+        return z, sign_test_p(self.wins[i], decided)
+
+    def compare_points(self, i: int, j: int) -> Tuple[float, float]:
+        """(z, p) : écart moyen de points entre i et j, apparié partie par partie"""
+        diff = self.diffs[(i, j)] if i < j else self.diffs[(j, i)]
+        mean = diff.mean if i < j else -diff.mean
+        if not diff.stderr:
+            z = 0.0 if not mean else math.copysign(math.inf, mean)
+        else:
+            z = mean / diff.stderr
+        return z, two_sided_p(z)
+
+    def ranking(self) -> List[int]:
+        """Sièges par victoires décroissantes, puis points moyens"""
+        return sorted(range(len(self.labels)), key=lambda seat: (-self.wins[seat], -self.points[seat].mean))
+
+    def is_settled(self, alpha: float) -> bool:
+        """Vrai si chaque siège du classement bat le suivant avec un risque global inférieur à alpha"""
+        order = self.ranking()
+        if len(order) < 2:
+            return True
+        threshold = alpha / (len(order) - 1)  # Bonferroni sur les paires voisines
+        return all(self.compare_wins(a, b)[1] < threshold for a, b in zip(order, order[1:]))
+
+    def display(self, confidence: float = 0.95):
+        """Affiche victoires et points moyens avec leurs intervalles, puis les comparaisons par paires"""
+        percent = round(confidence * 100)
+        print(f"\n📊 Résultats après {self.games} parties (intervalles à {percent}%) :")
+        print("="*60)
+        order = self.ranking()
+        for seat in order:
+            low, high = self.win_interval(seat, confidence)
+            points_low, points_high = self.points[seat].interval(confidence)
+            print(f"{self.labels[seat].capitalize():12} | "
+                  f"Victoires: {self.wins[seat]:2d} ({self.win_rate(seat) * 100:5.1f}%) "
+                  f"[{low * 100:5.1f} – {high * 100:5.1f}] | "
+                  f"Points moy: {self.points[seat].mean:5.1f} [{points_low:5.1f} – {points_high:5.1f}]")
+
+        print("\n⚔️  Comparaisons par paires (p-valeurs, victoires / points) :")
+        for rank, a in enumerate(order):
+            for b in order[rank + 1:]:
+                _, p_wins = self.compare_wins(a, b)
+                _, p_points = self.compare_points(a, b)
+                marker = "✅" if p_wins < 1 - confidence else "  "
+                print(f"{marker} {self.labels[a]:>13} vs {self.labels[b]:<13} "
+                      f"p={p_wins:.3g} / p={p_points:.3g}")
@@ -0,0 +1,136 @@
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from simulation import (DEFAULT_RULES, END_REASONS, HEURISTIC_PERSONALITIES, AIPersonality, AITester,
+                        GamePool, Rules, _game_seeds)
+from stats import BattleStats, RunningStats
+
+
+class VariantStats:
+    """Mesures d'une variante de règles pour une composition de table, fusionnables entre processus"""
+
+    def __init__(self, personalities: Sequence[AIPersonality]):
+        self.games = 0
+        self.turns = RunningStats()
+        self.spread = RunningStats()  # Écart entre le meilleur et le moins bon score d'une partie
+        self.end_reasons: Dict[int, int] = {}
+        self.seats = AITester.empty_stats(list(personalities))
+
+    def record_game(self, game):
+        scores = [player.point for player in game.players]
+        self.games += 1
+        self.turns.add(game.turn_counter)
+        self.spread.add(max(scores) - min(scores))
+        reason = game.end_reason(game.rules.battle_turns)  # Limite appliquée par play_ai_game
+        self.end_reasons[reason] = self.end_reasons.get(reason, 0) + 1
+        self.seats.record_game(game)
+
+    def merge(self, other: "VariantStats"):
+        self.games += other.games
+        self.turns.merge(other.turns)
+        self.spread.merge(other.spread)
+        for reason, count in other.end_reasons.items():
+            self.end_reasons[reason] = self.end_reasons.get(reason, 0) + count
+        self.seats.merge(other.seats)
+
+
+def variant_grid(**axes: Sequence) -> List[Rules]:
+    """Produit cartésien de valeurs de règles, ex. variant_grid(max_cards=[10, 12], buildings_to_end=[6, 8])"""
+    names = list(axes)
+    return [DEFAULT_RULES._replace(**dict(zip(names, values)))
+            for values in itertools.product(*(axes[name] for name in names))]
+
+
+def describe(rules: Rules) -> str:
+    """Différences avec les règles par défaut"""
+    changes = [f"{name}={value}" for name, value in rules._asdict().items()
+               if value != getattr(DEFAULT_RULES, name)]
+    return ", ".join(changes) or "règles par défaut"
+
+
+def _play_variant_chunk(rules: Rules, personalities: List[AIPersonality],
+                        seeds: List[Optional[int]]) -> VariantStats:
+    """Joue un lot de parties d'une variante (exécuté dans un processus du pool)"""
+    stats = VariantStats(personalities)
+    pool = GamePool()
+    for seed in seeds:
+        stats.record_game(AITester.play_ai_game(personalities, seed, rules=rules, pool=pool))
+    return stats
+
+
+def run_sweep(variants: List[Rules], lineups: Optional[List[List[AIPersonality]]] = None,
+              nb_games: int = 200, seed: int = 0,
+              workers: Optional[int] = None) -> List[Tuple[Rules, List[AIPersonality], VariantStats]]:
+    """Joue nb_games parties par variante et par composition, les mêmes graines partout"""
+    if lineups is None:
+        lineups = [list(HEURISTIC_PERSONALITIES)]
+    workers = workers or os.cpu_count() or 1
+    seeds = _game_seeds(seed, nb_games)
+    cells = [(rules, lineup) for rules in variants for lineup in lineups]
+
+    # Assez de lots pour occuper tous les processus, même avec peu de variantes
+    nb_chunks = max(1, min(nb_games, -(-workers * 4 // len(cells))))
+    chunks = [seeds[i::nb_chunks] for i in range(nb_chunks)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [[pool.submit(_play_variant_chunk, rules, lineup, chunk) for chunk in chunks]
+                   for rules, lineup in cells]
+        for (rules, lineup), cell_futures in zip(cells, futures):
+            stats = VariantStats(lineup)
+            for future in cell_futures:
+                stats.merge(future.result())
+            results.append((rules, lineup, stats))
+    return results
+
+
+def display_sweep(results: List[Tuple[Rules, List[AIPersonality], VariantStats]]):
+    """Affiche durée des parties, écart des scores et taux de victoire par variante"""
+    for rules, lineup, stats in results:
+        print(f"\n🧪 {describe(rules)} — {', '.join(p.value for p in lineup)}")
+        print("="*60)
+        ends = ", ".join(f"{END_REASONS[reason]} {count / stats.games:.0%}"
+                         for reason, count in sorted(stats.end_reasons.items()))
+        print(f"Tours: {stats.turns.mean:5.1f} ± {stats.turns.stdev:4.1f} | "
+              f"Écart des scores: {stats.spread.mean:5.1f} ± {stats.spread.stdev:4.1f} | Fins: {ends}")
+        seats: BattleStats = stats.seats
+        for seat in seats.ranking():
+            low, high = seats.win_interval(seat)
+            print(f"{seats.labels[seat].capitalize():12} | "
+                  f"Victoires: {seats.win_rate(seat) * 100:5.1f}% [{low * 100:5.1f} – {high * 100:5.1f}] | "
+                  f"Points moy: {seats.points[seat].mean:5.1f}")
+
+
+def _parse_axis(text: str) -> Tuple[str, List[int]]:
+    name, _, values = text.partition("=")
+    if name not in Rules._fields or not values:
+        raise argparse.ArgumentTypeError(f"Attendu règle=v1,v2 avec règle parmi {', '.join(Rules._fields)}")
+    return name, [int(value) for value in values.split(",")]
+
+
+def _parse_lineup(text: str) -> List[AIPersonality]:
+    return [AIPersonality(name) for name in text.split(",")]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare des variantes de règles sur des parties entre IAs")
+    parser.add_argument("--set", dest="axes", action="append", type=_parse_axis, default=[],
+                        metavar="RÈGLE=V1,V2", help="valeurs à essayer pour une règle (répétable)")
+    parser.add_argument("--lineup", dest="lineups", action="append", type=_parse_lineup,
+                        metavar="P1,P2", help="composition de table (répétable ; toutes les personnalités par défaut)")
+    parser.add_argument("--games", type=int, default=200, help="parties par variante et par composition")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    variants = variant_grid(**dict(args.axes))
+    display_sweep(run_sweep(variants, args.lineups, args.games, args.seed, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from simulation import HEURISTIC_PERSONALITIES, AIPersonality, AIPlayer, AITester, Game, GamePool, _game_seeds
+
+
+# Paramètres réglés, dans l'ordre de AIPlayer.WEIGHTS, avec leurs bornes
+PARAMETERS: Tuple[Tuple[str, float, float], ...] = (
+    ("points", 0.0, 4.0),      # valeur d'un point de victoire
+    ("money", 0.0, 4.0),       # valeur d'une pièce de revenu
+    ("special", 0.0, 4.0),     # valeur des bonus de couleur
+    ("cost", 0.0, 2.0),        # pénalité par carte de coût (choix et défausses)
+    ("threshold", -10.0, 10.0),  # valeur minimale pour construire plutôt que piocher
+)
+
+Weights = Tuple[float, float, float, float, float]
+
+
+class Profile(NamedTuple):
+    """Personnalité réglée : poids trouvés par la recherche et leur évaluation"""
+    name: str
+    personality: AIPersonality  # Personnalité de base (nom affiché, MCTS exclu)
+    weights: Weights
+    fitness: float
+    games: int
+
+    def add_to(self, game: Game, name: Optional[str] = None, difficulty: float = 1.0) -> AIPlayer:
+        """Ajoute à la partie une IA jouant avec ce profil"""
+        return game.add_ai_player(name or f"IA-{self.name}", self.personality, difficulty, self.weights)
+
+
+def save_profile(profile: Profile, path: str):
+    data = {
+        "name": profile.name,
+        "personality": profile.personality.value,
+        "weights": {name: value for (name, _, _), value in zip(PARAMETERS, profile.weights)},
+        "fitness": profile.fitness,
+        "games": profile.games,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_profile(path: str) -> Profile:
+    with open(path) as f:
+        data = json.load(f)
+    return Profile(
+        name=data["name"],
+        personality=AIPersonality(data["personality"]),
+        weights=tuple(float(data["weights"][name]) for name, _, _ in PARAMETERS),
+        fitness=float(data.get("fitness", 0.0)),
+        games=int(data.get("games", 0)),
+    )
+
+
+def _clip(weights: Sequence[float]) -> Weights:
+    return tuple(min(max(value, low), high) for value, (_, low, high) in zip(weights, PARAMETERS))
+
+
+def _evaluate(personality: AIPersonality, weights: Weights, opponents: List[AIPersonality],
+              games: List[Tuple[int, int]], max_turns: Optional[int]) -> Tuple[float, float, int]:
+    """Joue les parties (numéro, graine) d'un candidat ; retourne (victoires, somme des écarts, parties)"""
+    nb_players = len(opponents) + 1
+    wins = margin = 0.0
+    pool = GamePool()
+    for number, seed in games:
+        # Le candidat change de siège d'une partie à l'autre : pas d'avantage de position
+        seat = number % nb_players
+        personalities = list(opponents)
+        personalities.insert(seat, personality)
+        seat_weights: List[Optional[Weights]] = [None] * nb_players
+        seat_weights[seat] = weights
+        game = AITester.play_ai_game(personalities, seed, max_turns, weights=seat_weights, pool=pool)
+
+        scores = [player.point for player in game.players]
+        best_other = max(score for i, score in enumerate(scores) if i != seat)
+        if scores.index(max(scores)) == seat:  # Même départage que AITester.record_game
+            wins += 1
+        margin += scores[seat] - best_other
+    return wins, margin, len(games)
+
+
+def _fitness(wins: float, margin: float, games: int) -> float:
+    """Taux de victoire, départagé par l'écart moyen au meilleur adversaire"""
+    return (wins + margin / 100) / games if games else 0.0
+
+
+def evaluate_population(pool: ProcessPoolExecutor, personality: AIPersonality,
+                        candidates: List[Weights], opponents: List[AIPersonality],
+                        seeds: List[int], max_turns: Optional[int], workers: int) -> List[float]:
+    """Fitness de chaque candidat sur les mêmes parties (graines communes : comparaisons moins bruitées)"""
+    games = list(enumerate(seeds))
+    nb_chunks = max(1, -(-workers // len(candidates)))  # Assez de tâches pour occuper tous les workers
+    futures = [
+        [pool.submit(_evaluate, personality, weights, opponents, games[i::nb_chunks], max_turns)
+         for i in range(nb_chunks)]
+        for weights in candidates
+    ]
+    fitness = []
+    for chunks in futures:
+        totals = [sum(values) for values in zip(*(future.result() for future in chunks))]
+        fitness.append(_fitness(*totals))
+    return fitness
+
+
+def tune(personality: AIPersonality = AIPersonality.BALANCED,
+         opponents: Optional[List[AIPersonality]] = None, generations: int = 10,
+         population: int = 12, games: int = 60, seed: int = 0, workers: Optional[int] = None,
+         max_turns: Optional[int] = None, sigma: float = 0.3, name: Optional[str] = None) -> Profile:
+    """Stratégie d'évolution à covariance diagonale (CMA simplifiée) sur les poids d'une personnalité"""
+    if personality not in HEURISTIC_PERSONALITIES:
+        raise ValueError("Seules les personnalités à poids fixes peuvent être réglées")
+    if opponents is None:
+        opponents = [p for p in HEURISTIC_PERSONALITIES if p is not personality]
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+
+    # Recombinaison pondérée des meilleurs (poids logarithmiques, comme CMA-ES)
+    parents = max(population // 2, 1)
+    recombination = [math.log(parents + 0.5) - math.log(i + 1) for i in range(parents)]
+    total = sum(recombination)
+    recombination = [w / total for w in recombination]
+
+    mean = list(AIPlayer.WEIGHTS[personality])
+    steps = [sigma * (high - low) for _, low, high in PARAMETERS]
+    min_steps = [0.01 * (high - low) for _, low, high in PARAMETERS]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for generation in range(generations):
+            candidates = [tuple(mean)] + [
+                _clip([m + s * rng.gauss(0.0, 1.0) for m, s in zip(mean, steps)])
+                for _ in range(population - 1)
+            ]
+            seeds = _game_seeds(rng.getrandbits(32), games)
+            fitness = evaluate_population(pool, personality, candidates, opponents, seeds, max_turns, workers)
+
+            ranked = sorted(range(len(candidates)), key=lambda i: -fitness[i])[:parents]
+            new_mean = [sum(w * candidates[i][d] for w, i in zip(recombination, ranked))
+                        for d in range(len(PARAMETERS))]
+            # Pas par dimension : dispersion pondérée des meilleurs autour de l'ancienne moyenne, lissée
+            for d in range(len(PARAMETERS)):
+                spread = math.sqrt(sum(w * (candidates[i][d] - mean[d]) ** 2 for w, i in zip(recombination, ranked)))
+                steps[d] = max(0.5 * steps[d] + 0.5 * spread, min_steps[d])
+            mean = list(_clip(new_mean))
+            print(f"Génération {generation + 1}/{generations} : meilleure fitness {fitness[ranked[0]]:.3f}, "
+                  f"moyenne courante {fitness[0]:.3f}")
+
+        # Validation sur des parties neuves : la moyenne finale contre les poids d'origine
+        seeds = _game_seeds(rng.getrandbits(32), games * 4)
+        finalists = [tuple(mean), AIPlayer.WEIGHTS[personality]]
+        fitness = evaluate_population(pool, personality, finalists, opponents, seeds, max_turns, workers)
+
+    best = 0 if fitness[0] >= fitness[1] else 1
+    return Profile(name or f"{personality.value}-tuned", personality,
+                   tuple(round(value, 4) for value in finalists[best]), fitness[best], len(seeds))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Règle les poids d'une personnalité IA par recherche évolutionnaire")
+    parser.add_argument("personality", nargs="?", default=AIPersonality.BALANCED.value,
+                        choices=[p.value for p in HEURISTIC_PERSONALITIES])
+    parser.add_argument("--out", help="fichier JSON du profil (défaut : <personnalité>-tuned.json)")
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--population", type=int, default=12)
+    parser.add_argument("--games", type=int, default=60, help="parties par candidat et par génération")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    profile = tune(AIPersonality(args.personality), generations=args.generations,
+                   population=args.population, games=args.games, seed=args.seed, workers=args.workers)
+    path = args.out or f"{profile.name}.json"
+    save_profile(profile, path)
+    print(f"Profil {profile.name} (fitness {profile.fitness:.3f} sur {profile.games} parties) "
+          f"enregistré dans {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())